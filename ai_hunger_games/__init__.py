@@ -8,21 +8,36 @@ voting on answers, and evolving over time using genetic algorithm principles.
 __version__ = "1.0.0"
 __author__ = "AI Hunger Games Team"
 
-from .agent import Agent
-from .simulation import HungerGamesSimulation, create_simulation
-from .llm_interface import LLMInterface, get_llm_interface
-from .voting import VotingSystem
-from .evolution import EvolutionManager
-from .logger import SimulationLogger, create_logger
-
-__all__ = [
-    "Agent",
-    "HungerGamesSimulation",
-    "create_simulation",
-    "LLMInterface",
-    "get_llm_interface",
-    "VotingSystem",
-    "EvolutionManager",
-    "SimulationLogger",
-    "create_logger"
-]
+import importlib
+from typing import Any
+
+# Public names are imported on first access (PEP 562) so that importing the
+# package does not pull in requests, numpy, etc. until they are needed
+_LAZY_EXPORTS = {
+    "Agent": ".agent",
+    "HungerGamesSimulation": ".simulation",
+    "create_simulation": ".simulation",
+    "LLMInterface": ".llm_interface",
+    "get_llm_interface": ".llm_interface",
+    "VotingSystem": ".voting",
+    "EvolutionManager": ".evolution",
+    "SimulationLogger": ".logger",
+    "create_logger": ".logger"
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    """Import and cache a public name on first access."""
+    if name not in _LAZY_EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """Include lazily exported names in dir()."""
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,26 @@
+"""
+Hot paths for AI Hunger Games.
+Kept in plain Python: with only a handful of traits per draw, the `random`
+module is cheaper than calling into a compiled kernel.
+"""
+
+import random
+from typing import List
+
+
+def sample_mutation_indices(n_traits: int, rate: float, max_mutations: int = 2) -> List[int]:
+    """
+    Decide whether to mutate and pick which traits to apply.
+
+    Args:
+        n_traits: Number of available mutation traits
+        rate: Probability of applying any mutation
+        max_mutations: Maximum number of distinct traits to pick
+
+    Returns:
+        Indices into the trait list (empty when no mutation happens)
+    """
+    if random.random() >= rate:
+        return []
+    num_mutations = random.randint(1, max_mutations)
+    return random.sample(range(n_traits), min(num_mutations, n_traits))
@@ -3,9 +3,56 @@ Agent class for AI Hunger Games simulation.
 Each agent has a personality, memory, and can generate answers and vote.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, List, Optional, Any
+from collections import deque
+from itertools import islice
 import random
+import re
+import time
 from datetime import datetime
+from config import MAX_MEMORY_SIZE, DEFAULT_STOP_TOKENS
+from agent_pool import AgentPool, PoolStat
+from _fastpath import sample_mutation_indices
+
+
+# First line of a vote response: optional "Agent" prefix, markdown/quote
+# decoration and an optional ": justification" tail around the voted name
+_VOTE_RE = re.compile(
+    r'^[\s*"\']*(?:Agent\s+)?(?P<name>[^:\n]+?)[\s*"\'.]*(?::\s*(?P<rest>.*))?$',
+    re.IGNORECASE
+)
+
+
+def build_vote_system_message(question: str, answers: Dict[str, str]) -> str:
+    """
+    Build the voting system message for one round's answer table.
+    
+    The message is the same for every voter in a round, so callers that
+    collect many votes should build it once and pass it to each agent.
+    
+    Args:
+        question: The question that was asked
+        answers: Every answer given this round, in display order
+        
+    Returns:
+        System message listing the question and every answer
+    """
+    answers_text = "\n\n".join(
+        f"Agent {name}:\n{answer}" 
+        for name, answer in answers.items()
+    )
+    
+    return f"""Question that was asked: {question}
+
+Here are the answers from different agents:
+
+{answers_text}
+
+Respond with ONLY the name of the agent who gave the BEST answer on the first line, followed by a 1-2 sentence justification on the next line.
+
+Format:
+Agent Name
+Justification here."""
 
 
 class Agent:
@@ -15,13 +62,30 @@ class Agent:
     Attributes:
         name: The agent's unique name
         personality_prompt: The personality description that guides the agent's behavior
-        memory: List of past interactions and learnings
+        memory: Bounded deque of past interactions and learnings (most recent last)
         model: The Ollama model name to use for this agent
         generation: Which generation this agent belongs to (0 for original)
         parent_name: Name of the parent agent (if evolved)
         birth_round: The round in which this agent was created
+        pool: AgentPool holding this agent's statistics
+        pool_index: This agent's row in the pool
     """
     
+    # No per-instance __dict__: all_agents_history keeps every agent ever created
+    __slots__ = (
+        "name", "personality_prompt", "memory", "model", "generation",
+        "parent_name", "birth_round", "pool", "pool_index",
+        "_memory_version", "_dict_cache", "_dict_cache_key",
+        "_static_system_prefix", "_prompt_options",
+        "_vote_user_msg", "_vote_user_msg_no_self"
+    )
+    
+    # Statistics live in the pool's NumPy columns, not on the instance
+    votes_received = PoolStat()
+    votes_cast = PoolStat()
+    rounds_survived = PoolStat()
+    answers_given = PoolStat()
+    
     def __init__(
         self,
         name: str,
@@ -29,7 +93,8 @@ class Agent:
         model: str = "llama2",
         generation: int = 0,
         parent_name: Optional[str] = None,
-        birth_round: int = 0
+        birth_round: int = 0,
+        pool: Optional[AgentPool] = None
     ):
         """
         Initialize a new Agent.
@@ -41,20 +106,50 @@ class Agent:
             generation: Generation number (0 for original agents)
             parent_name: Name of parent agent if evolved
             birth_round: Round number when agent was created
+            pool: Shared stats pool (a private one is created if omitted)
         """
         self.name: str = name
         self.personality_prompt: str = personality_prompt
-        self.memory: List[Dict[str, Any]] = []
+        self.memory: Deque[Dict[str, Any]] = deque(maxlen=MAX_MEMORY_SIZE)
         self.model: str = model
         self.generation: int = generation
         self.parent_name: Optional[str] = parent_name
         self.birth_round: int = birth_round
-        self.votes_received: int = 0
-        self.votes_cast: int = 0
-        self.rounds_survived: int = 0
-        self.answers_given: int = 0
+        self.pool: AgentPool = pool if pool is not None else AgentPool(capacity=1)
+        self.pool_index: int = self.pool.register(name)
+        
+        # to_dict() is reused until the stats pool or the memory changes
+        self._memory_version: int = 0
+        self._dict_cache: Optional[Dict[str, Any]] = None
+        self._dict_cache_key: Optional[tuple] = None
         
-    def add_memory(self, memory_type: str, content: str, round_num: int) -> None:
+        # Identical at the start of every prompt this agent sends, so Ollama
+        # can reuse the cached prefix instead of re-processing it each call
+        self._static_system_prefix: str = (
+            f"You are {name}, an AI agent with the following personality:\n"
+            f"{personality_prompt}\n"
+        )
+        # Ollama has no tokenizer endpoint; ~4 characters per token is close enough.
+        # Answers are a single short paragraph, so stop at the first break.
+        self._prompt_options: Dict[str, Any] = {
+            "num_keep": len(self._static_system_prefix) // 4,
+            "stop": DEFAULT_STOP_TOKENS
+        }
+        # Vote user messages depend only on the agent, so build them up front
+        self._vote_user_msg: str = self._static_system_prefix + (
+            "\nBased on your personality and values, which agent gave the BEST answer?"
+        )
+        self._vote_user_msg_no_self: str = (
+            self._vote_user_msg + f" You may not vote for yourself ({name})."
+        )
+        
+    def add_memory(
+        self,
+        memory_type: str,
+        content: str,
+        round_num: int,
+        ts: Optional[float] = None
+    ) -> None:
         """
         Add a memory to the agent's memory buffer.
         
@@ -62,19 +157,17 @@ class Agent:
             memory_type: Type of memory (e.g., "question", "answer", "vote", "elimination")
             content: The content of the memory
             round_num: The round number when this memory was created
+            ts: Epoch timestamp shared by the caller (defaults to now)
         """
         memory_entry = {
             "type": memory_type,
             "content": content,
             "round": round_num,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": ts if ts is not None else time.time()
         }
+        # Bounded deque drops the oldest memory once MAX_MEMORY_SIZE is reached
         self.memory.append(memory_entry)
-        
-        # Limit memory size (keep most recent memories)
-        from config import MAX_MEMORY_SIZE
-        if len(self.memory) > MAX_MEMORY_SIZE:
-            self.memory = self.memory[-MAX_MEMORY_SIZE:]
+        self._memory_version += 1
     
     def get_memory_context(self, max_memories: int = 5) -> str:
         """
@@ -89,11 +182,31 @@ class Agent:
         if not self.memory:
             return "No previous memories."
         
-        recent_memories = self.memory[-max_memories:]
-        context = "Recent memories:\n"
-        for mem in recent_memories:
-            context += f"- Round {mem['round']} ({mem['type']}): {mem['content'][:100]}...\n"
-        return context
+        recent_memories = islice(self.memory, max(0, len(self.memory) - max_memories), None)
+        parts = ["Recent memories:"]
+        parts.extend(
+            f"- Round {mem['round']} ({mem['type']}): {mem['content'][:100]}..."
+            for mem in recent_memories
+        )
+        return "\n".join(parts) + "\n"
+    
+    def build_answer_prompt(self, question: str) -> str:
+        """
+        Build the answer prompt with personality and memory context.
+        
+        Args:
+            question: The question to answer
+            
+        Returns:
+            The full prompt string
+        """
+        memory_context = self.get_memory_context()
+        
+        return self._static_system_prefix + f"""
+Question: {question}
+
+{memory_context}
+Provide a thoughtful answer that reflects your unique personality and perspective. Be concise but insightful (2-4 sentences)."""
     
     def generate_answer(
         self,
@@ -112,26 +225,151 @@ class Agent:
         Returns:
             The generated answer string
         """
-        # Build the prompt with personality and memory context
-        memory_context = self.get_memory_context()
+        full_prompt = self.build_answer_prompt(question)
+        answer = llm_interface.generate(
+            full_prompt, self.model, options=self._prompt_options, semantic=True
+        )
+        self.record_answer(question, answer, round_num)
+        return answer
+    
+    async def agenerate_answer(
+        self,
+        question: str,
+        round_num: int,
+        llm_interface: Any  # Type hint for LLMInterface
+    ) -> str:
+        """
+        Async version of generate_answer, awaiting the LLM call.
         
-        full_prompt = f"""You are {self.name}, an AI agent with the following personality:
-{self.personality_prompt}
-
-{memory_context}
-
-Question: {question}
-
-Provide a thoughtful answer that reflects your unique personality and perspective. Be concise but insightful (2-4 sentences)."""
-
-        # Generate answer using LLM interface
-        answer = llm_interface.generate(full_prompt, self.model)
+        Args:
+            question: The question to answer
+            round_num: Current round number
+            llm_interface: The LLM interface to use for generation
+            
+        Returns:
+            The generated answer string
+        """
+        full_prompt = self.build_answer_prompt(question)
+        answer = await llm_interface.agenerate(
+            full_prompt, self.model, options=self._prompt_options, semantic=True
+        )
+        self.record_answer(question, answer, round_num)
+        return answer
+    
+    @property
+    def prompt_options(self) -> Dict[str, Any]:
+        """Ollama options sent with every prompt from this agent."""
+        return self._prompt_options
+    
+    @property
+    def system_prefix(self) -> str:
+        """Static prefix shared by every prompt from this agent."""
+        return self._static_system_prefix
+    
+    def record_answer(
+        self,
+        question: str,
+        answer: str,
+        round_num: int,
+        ts: Optional[float] = None
+    ) -> None:
+        """
+        Store an answer in memory and update answer stats.
         
-        # Store in memory
-        self.add_memory("answer", f"Q: {question} | A: {answer}", round_num)
+        Used directly when the answer was generated outside generate_answer,
+        e.g. as part of a batched request.
+        
+        Args:
+            question: The question that was answered
+            answer: The generated answer
+            round_num: Current round number
+            ts: Epoch timestamp shared by the caller (defaults to now)
+        """
+        self.add_memory("answer", f"Q: {question} | A: {answer}", round_num, ts)
         self.answers_given += 1
+    
+    def build_vote_messages(
+        self,
+        question: str,
+        answers: Dict[str, str],
+        allow_self_voting: bool = False,
+        system_msg: Optional[str] = None
+    ) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for voting on the round's answers.
         
-        return answer
+        The system message holds the question and every answer, so it is
+        byte-identical for all voters in a round and the server can reuse its
+        cached prefill. Only the short user message is agent-specific.
+        
+        Args:
+            question: The question that was asked
+            answers: Every answer given this round
+            allow_self_voting: Whether the agent can vote for itself
+            system_msg: The round's build_vote_system_message output, if the
+                caller already built it (built here otherwise)
+            
+        Returns:
+            List of chat messages (system, user)
+        """
+        if system_msg is None:
+            system_msg = build_vote_system_message(question, answers)
+        user_msg = self._vote_user_msg if allow_self_voting else self._vote_user_msg_no_self
+        
+        return [
+            {"role": "system", "content": system_msg},
+            {"role": "user", "content": user_msg}
+        ]
+    
+    def build_vote_request(
+        self,
+        question: str,
+        answers: Dict[str, str],
+        allow_self_voting: bool = False,
+        system_msg: Optional[str] = None
+    ) -> Optional[List[Dict[str, str]]]:
+        """
+        Build this agent's vote chat messages, if it has anyone to vote for.
+        
+        Args:
+            question: The question that was asked
+            answers: Every answer given this round
+            allow_self_voting: Whether the agent can vote for itself
+            system_msg: The round's shared vote system message, if already built
+            
+        Returns:
+            Chat messages for the vote, or None when no other answer is available
+        """
+        if not self._available_answers(answers, allow_self_voting):
+            return None
+        return self.build_vote_messages(question, answers, allow_self_voting, system_msg)
+    
+    def record_vote(
+        self,
+        vote_response: Optional[str],
+        answers: Dict[str, str],
+        round_num: int,
+        allow_self_voting: bool = False
+    ) -> tuple[str, str]:
+        """
+        Turn the response to a vote request into this agent's vote.
+        
+        Args:
+            vote_response: Raw LLM response (None if no request was needed)
+            answers: Every answer given this round
+            round_num: Current round number
+            allow_self_voting: Whether the agent can vote for itself
+            
+        Returns:
+            Tuple of (voted_agent_name, justification)
+        """
+        available_answers = self._available_answers(answers, allow_self_voting)
+        
+        if not available_answers:
+            # Edge case: only self answer available
+            return self.name, "No other options available."
+        
+        return self._record_vote(vote_response, available_answers, round_num)
     
     def vote_on_answers(
         self,
@@ -154,48 +392,84 @@ Provide a thoughtful answer that reflects your unique personality and perspectiv
         Returns:
             Tuple of (voted_agent_name, justification)
         """
-        # Filter out self if self-voting not allowed
-        available_answers = {k: v for k, v in answers.items() 
-                           if allow_self_voting or k != self.name}
-        
-        if not available_answers:
-            # Edge case: only self answer available
-            return self.name, "No other options available."
+        messages = self.build_vote_request(question, answers, allow_self_voting)
+        vote_response = None
+        if messages is not None:
+            vote_response = llm_interface.chat(messages, self.model)
+        return self.record_vote(vote_response, answers, round_num, allow_self_voting)
+    
+    async def avote_on_answers(
+        self,
+        question: str,
+        answers: Dict[str, str],
+        round_num: int,
+        llm_interface: Any,
+        allow_self_voting: bool = False
+    ) -> tuple[str, str]:
+        """
+        Async version of vote_on_answers, awaiting the LLM call.
         
-        # Build voting prompt
-        answers_text = "\n\n".join([
-            f"Agent {name}:\n{answer}" 
-            for name, answer in available_answers.items()
-        ])
+        Args:
+            question: The question that was asked
+            answers: Dictionary mapping agent names to their answers
+            round_num: Current round number
+            llm_interface: The LLM interface to use for generation
+            allow_self_voting: Whether the agent can vote for itself
+            
+        Returns:
+            Tuple of (voted_agent_name, justification)
+        """
+        messages = self.build_vote_request(question, answers, allow_self_voting)
+        vote_response = None
+        if messages is not None:
+            vote_response = await llm_interface.achat(messages, self.model)
+        return self.record_vote(vote_response, answers, round_num, allow_self_voting)
+    
+    def _available_answers(
+        self,
+        answers: Dict[str, str],
+        allow_self_voting: bool
+    ) -> Dict[str, str]:
+        """Filter out this agent's own answer if self-voting is not allowed."""
+        if allow_self_voting:
+            return answers
         
-        voting_prompt = f"""You are {self.name}, an AI agent with this personality:
-{self.personality_prompt}
-
-Question that was asked: {question}
-
-Here are the answers from different agents:
-
-{answers_text}
-
-Based on your personality and values, which agent gave the BEST answer? 
-Respond with ONLY the agent's name on the first line, followed by a 1-2 sentence justification on the next line.
-
-Format:
-Agent Name
-Justification here."""
-
-        # Generate vote
-        vote_response = llm_interface.generate(voting_prompt, self.model)
+        name = self.name
+        return {k: v for k, v in answers.items() if k != name}
+    
+    def _record_vote(
+        self,
+        vote_response: str,
+        available_answers: Dict[str, str],
+        round_num: int
+    ) -> tuple[str, str]:
+        """
+        Parse a raw vote response, then store the vote in memory.
         
-        # Parse response
+        Args:
+            vote_response: Raw LLM response to the voting prompt
+            available_answers: Answers this agent was allowed to vote for
+            round_num: Current round number
+            
+        Returns:
+            Tuple of (voted_agent_name, justification)
+        """
         lines = vote_response.strip().split('\n', 1)
-        voted_for = lines[0].strip()
-        justification = lines[1].strip() if len(lines) > 1 else "No justification provided."
+        justification = lines[1].strip() if len(lines) > 1 else ""
+        
+        # Validate vote (must be one of the available agents, any casing)
+        name_map = {name.lower(): name for name in available_answers}
+        match = _VOTE_RE.match(lines[0])
+        voted_for = name_map.get(lines[0].strip().lower())
+        if voted_for is None and match:
+            voted_for = name_map.get(match.group("name").lower())
         
-        # Validate vote (must be one of the available agents)
-        if voted_for not in available_answers:
+        if voted_for is not None:
+            if not justification:
+                justification = (match and match.group("rest")) or "No justification provided."
+        else:
             # Fallback: pick random agent
-            voted_for = random.choice(list(available_answers.keys()))
+            voted_for = random.choice(tuple(available_answers))
             justification = "Vote parsing failed, random selection made."
         
         # Store in memory
@@ -218,9 +492,9 @@ Justification here."""
         mutated_prompt = self.personality_prompt
         
         # Add mutations based on mutation rate
-        if random.random() < mutation_rate:
-            num_mutations = random.randint(1, 2)
-            selected_traits = random.sample(mutation_traits, min(num_mutations, len(mutation_traits)))
+        indices = sample_mutation_indices(len(mutation_traits), mutation_rate, 2)
+        if indices:
+            selected_traits = [mutation_traits[i] for i in indices]
             
             mutation_text = ", ".join(selected_traits)
             mutated_prompt += f"\n\nEvolved traits: You are now {mutation_text} compared to your predecessor."
@@ -231,23 +505,38 @@ Justification here."""
         """
         Convert agent to dictionary for logging and serialization.
         
+        The result is cached and shared between callers until the agent's
+        stats or memory change, so treat it as read-only.
+        
         Returns:
             Dictionary representation of the agent
         """
-        return {
+        # Key on this agent's own row, so writes to other agents' stats keep it valid
+        stats = (self.votes_received, self.votes_cast, self.rounds_survived, self.answers_given)
+        key = (stats, self._memory_version)
+        if self._dict_cache_key == key:
+            return self._dict_cache
+        
+        votes_received, votes_cast, rounds_survived, answers_given = stats
+        self._dict_cache = {
             "name": self.name,
             "personality_prompt": self.personality_prompt,
             "model": self.model,
             "generation": self.generation,
             "parent_name": self.parent_name,
             "birth_round": self.birth_round,
-            "votes_received": self.votes_received,
-            "votes_cast": self.votes_cast,
-            "rounds_survived": self.rounds_survived,
-            "answers_given": self.answers_given,
+            "votes_received": votes_received,
+            "votes_cast": votes_cast,
+            "rounds_survived": rounds_survived,
+            "answers_given": answers_given,
             "memory_count": len(self.memory),
-            "recent_memories": self.memory[-3:] if self.memory else []
+            "recent_memories": [
+                {**mem, "timestamp": datetime.fromtimestamp(mem["timestamp"]).isoformat()}
+                for mem in islice(self.memory, max(0, len(self.memory) - 3), None)
+            ]
         }
+        self._dict_cache_key = key
+        return self._dict_cache
     
     def __repr__(self) -> str:
         """String representation of the agent."""
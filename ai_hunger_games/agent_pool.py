@@ -0,0 +1,123 @@
+"""
+Agent pool for AI Hunger Games.
+Stores per-agent statistics as NumPy columns (structure of arrays) so
+tallies and rankings over the population are vectorized operations.
+"""
+
+from typing import Any, Dict, Iterable, List
+import numpy as np
+
+
+STAT_FIELDS: tuple[str, ...] = (
+    "votes_received",
+    "votes_cast",
+    "rounds_survived",
+    "answers_given"
+)
+
+
+class AgentPool:
+    """
+    Column store for agent statistics, indexed by agent id.
+
+    Each registered agent gets a row index; every statistic in STAT_FIELDS
+    is an int32 column. Agents read and write their own row through
+    PoolStat attributes, so `agent.votes_received += 1` keeps working.
+    """
+
+    def __init__(self, capacity: int = 16):
+        """
+        Initialize an empty pool.
+
+        Args:
+            capacity: Initial number of rows to allocate
+        """
+        self.names: List[str] = []
+        self.columns: Dict[str, np.ndarray] = {
+            field: np.zeros(capacity, dtype=np.int32) for field in STAT_FIELDS
+        }
+
+    def register(self, name: str) -> int:
+        """
+        Add a row for a new agent.
+
+        Args:
+            name: Agent name
+
+        Returns:
+            Row index assigned to the agent
+        """
+        idx = len(self.names)
+        if idx == len(self.columns[STAT_FIELDS[0]]):
+            self._grow()
+        self.names.append(name)
+        return idx
+
+    def scatter_add(self, field: str, indices: Iterable[int], amount: int = 1) -> None:
+        """
+        Add `amount` to a column at each index (repeated indices accumulate).
+
+        Args:
+            field: Statistic column name
+            indices: Row indices to update
+            amount: Value added per occurrence
+        """
+        np.add.at(self.columns[field], np.fromiter(indices, dtype=np.intp), amount)
+
+    def get_column(self, field: str, indices: Iterable[int]) -> np.ndarray:
+        """
+        Gather a column for the given rows.
+
+        Args:
+            field: Statistic column name
+            indices: Row indices to read
+
+        Returns:
+            Array of values in the order of `indices`
+        """
+        return self.columns[field][np.fromiter(indices, dtype=np.intp)]
+
+    def __len__(self) -> int:
+        """Number of registered agents."""
+        return len(self.names)
+
+    def _grow(self) -> None:
+        """Double the allocated rows of every column."""
+        for field, column in self.columns.items():
+            grown = np.zeros(max(1, len(column) * 2), dtype=column.dtype)
+            grown[:len(column)] = column
+            self.columns[field] = grown
+
+
+def scatter_add_agents(agents: Iterable[Any], field: str, amount: int = 1) -> None:
+    """
+    Add `amount` to a statistic once per agent occurrence.
+
+    Agents are grouped by pool so each pool gets one vectorized update.
+
+    Args:
+        agents: Agents to update (repeats accumulate)
+        field: Statistic column name
+        amount: Value added per occurrence
+    """
+    by_pool: Dict[int, tuple[AgentPool, List[int]]] = {}
+    for agent in agents:
+        by_pool.setdefault(id(agent.pool), (agent.pool, []))[1].append(agent.pool_index)
+
+    for pool, indices in by_pool.values():
+        pool.scatter_add(field, indices, amount)
+
+
+class PoolStat:
+    """Descriptor exposing one AgentPool column as a per-agent int attribute."""
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.field = name
+
+    def __get__(self, agent: Any, owner: type = None) -> Any:
+        if agent is None:
+            return self
+        return int(agent.pool.columns[self.field][agent.pool_index])
+
+    def __set__(self, agent: Any, value: int) -> None:
+        agent.pool.columns[self.field][agent.pool_index] = value
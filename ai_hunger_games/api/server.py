@@ -3,12 +3,15 @@ FastAPI server for AI Hunger Games web interface.
 Provides REST API endpoints for running simulations and retrieving results.
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator
+import asyncio
+import functools
+import orjson
 import uvicorn
-import json
 import os
 import sys
 
@@ -19,6 +22,13 @@ from simulation import create_simulation
 from config import NUM_AGENTS, NUM_ROUNDS, OLLAMA_MODEL, get_config
 
 
+class ORJSONResponse(JSONResponse):
+    """JSON response encoded with orjson, which is several times faster than stdlib json."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
 # Pydantic models for API
 class SimulationConfig(BaseModel):
     """Configuration for starting a simulation."""
@@ -31,7 +41,7 @@ class SimulationConfig(BaseModel):
 
 class SimulationStatus(BaseModel):
     """Status of a running simulation."""
-    status: str  # "idle", "running", "completed", "error"
+    status: str  # "idle", "running", "completed", "cancelled", "error"
     current_round: int = 0
     total_rounds: int = 0
     message: str = ""
@@ -41,7 +51,8 @@ class SimulationStatus(BaseModel):
 app = FastAPI(
     title="AI Hunger Games API",
     description="REST API for multi-agent evolution simulation",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Enable CORS for web interface
@@ -53,10 +64,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Simulation state
-current_simulation = None
-simulation_status = SimulationStatus(status="idle", message="No simulation running")
-simulation_results = None
+# Simulation state (only touched from the event loop)
+app.state.current_simulation = None
+app.state.current_status = SimulationStatus(status="idle", message="No simulation running")
+app.state.results = None
+app.state.status_subscribers = set()
+app.state.sim_task = None
+app.state.sim_lock = asyncio.Lock()  # Held for the lifetime of a simulation task
+
+
+def publish_status(status: SimulationStatus) -> None:
+    """
+    Record the latest status and push it to every stream subscriber.
+    
+    Args:
+        status: New simulation status
+    """
+    app.state.current_status = status
+    for queue in app.state.status_subscribers:
+        queue.put_nowait(status)
 
 
 @app.get("/")
@@ -69,7 +95,9 @@ async def root():
         "endpoints": {
             "config": "/config",
             "start": "/simulation/start",
+            "cancel": "/simulation/cancel",
             "status": "/simulation/status",
+            "status_stream": "/simulation/status/stream",
             "results": "/simulation/results",
             "logs": "/simulation/logs"
         }
@@ -83,42 +111,38 @@ async def get_config_endpoint():
 
 
 @app.post("/simulation/start")
-async def start_simulation(
-    config: SimulationConfig,
-    background_tasks: BackgroundTasks
-):
+async def start_simulation(config: SimulationConfig):
     """
     Start a new simulation.
     
     Args:
         config: Simulation configuration
-        background_tasks: FastAPI background tasks
         
     Returns:
         Status message
     """
-    global simulation_status, current_simulation, simulation_results
-    
-    if simulation_status.status == "running":
+    if app.state.sim_lock.locked():
         raise HTTPException(
             status_code=400,
             detail="A simulation is already running"
         )
     
+    # Uncontended, so this returns without yielding; released when the task
+    # finishes, even if it is cancelled before its first step
+    await app.state.sim_lock.acquire()
+    
     # Reset state
-    simulation_results = None
-    simulation_status = SimulationStatus(
+    app.state.results = None
+    publish_status(SimulationStatus(
         status="running",
         current_round=0,
         total_rounds=config.num_rounds,
         message="Simulation starting..."
-    )
+    ))
     
-    # Run simulation in background
-    background_tasks.add_task(
-        run_simulation_background,
-        config
-    )
+    # Run simulation as a task on the event loop
+    app.state.sim_task = asyncio.create_task(run_simulation_background(config))
+    app.state.sim_task.add_done_callback(lambda _: app.state.sim_lock.release())
     
     return {
         "message": "Simulation started",
@@ -126,18 +150,25 @@ async def start_simulation(
     }
 
 
-def run_simulation_background(config: SimulationConfig):
+async def run_simulation_background(config: SimulationConfig):
     """
     Run simulation in background.
     
     Args:
         config: Simulation configuration
     """
-    global simulation_status, current_simulation, simulation_results
+    async def on_round_complete(round_num: int, round_results: Dict[str, Any]) -> None:
+        publish_status(SimulationStatus(
+            status="running",
+            current_round=round_num,
+            total_rounds=config.num_rounds,
+            message=f"Round {round_num} complete: {round_results['eliminated']} eliminated"
+        ))
     
     try:
-        # Create simulation
-        sim = create_simulation(
+        # Create simulation (may open the prompt cache and load an embedding model)
+        sim = await asyncio.to_thread(
+            create_simulation,
             num_agents=config.num_agents,
             num_rounds=config.num_rounds,
             model=config.model,
@@ -145,48 +176,95 @@ def run_simulation_background(config: SimulationConfig):
             verbose=False
         )
         
-        current_simulation = sim
+        app.state.current_simulation = sim
         
         # Run simulation
-        results = sim.run_simulation(config.questions)
+        results = await sim.arun_simulation(config.questions, on_round_complete)
         
-        simulation_results = results
-        simulation_status = SimulationStatus(
+        app.state.results = results
+        publish_status(SimulationStatus(
             status="completed",
             current_round=config.num_rounds,
             total_rounds=config.num_rounds,
             message="Simulation completed successfully"
-        )
+        ))
         
+    except asyncio.CancelledError:
+        publish_status(SimulationStatus(
+            status="cancelled",
+            current_round=app.state.current_status.current_round,
+            total_rounds=config.num_rounds,
+            message="Simulation cancelled"
+        ))
+        raise
     except Exception as e:
-        simulation_status = SimulationStatus(
+        publish_status(SimulationStatus(
             status="error",
             message=f"Simulation failed: {str(e)}"
+        ))
+
+
+@app.post("/simulation/cancel")
+async def cancel_simulation():
+    """Cancel the running simulation, if any."""
+    task = app.state.sim_task
+    if task is None or task.done():
+        raise HTTPException(
+            status_code=400,
+            detail="No simulation is running"
         )
+    
+    task.cancel()
+    return {"message": "Cancellation requested"}
 
 
 @app.get("/simulation/status")
 async def get_simulation_status():
     """Get current simulation status."""
-    return simulation_status
+    return app.state.current_status
+
+
+@app.get("/simulation/status/stream")
+async def stream_simulation_status():
+    """
+    Stream status updates as server-sent events.
+    
+    Sends the current status immediately, then one event per update until
+    the simulation completes or fails.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    app.state.status_subscribers.add(queue)
+    
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            status = app.state.current_status
+            while True:
+                yield f"data: {status.model_dump_json()}\n\n"
+                if status.status != "running":
+                    break
+                status = await queue.get()
+        finally:
+            app.state.status_subscribers.discard(queue)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
 @app.get("/simulation/results")
 async def get_simulation_results():
     """Get simulation results (only available when completed)."""
-    if simulation_status.status != "completed":
+    if app.state.current_status.status != "completed":
         raise HTTPException(
             status_code=400,
             detail="Simulation not completed yet"
         )
     
-    if simulation_results is None:
+    if app.state.results is None:
         raise HTTPException(
             status_code=404,
             detail="No results available"
         )
     
-    return simulation_results
+    return app.state.results
 
 
 @app.get("/simulation/logs")
@@ -194,24 +272,45 @@ async def get_simulation_logs():
     """Get list of available simulation logs."""
     data_dir = "data"
     
-    if not os.path.exists(data_dir):
+    try:
+        dir_mtime_ns = os.stat(data_dir).st_mtime_ns
+    except FileNotFoundError:
         return {"logs": []}
     
+    return {"logs": _list_log_files(data_dir, dir_mtime_ns)}
+
+
+@functools.lru_cache(maxsize=1)
+def _list_log_files(data_dir: str, dir_mtime_ns: int) -> List[Dict[str, Any]]:
+    """
+    Scan the data directory for simulation logs.
+    
+    Cached on the directory mtime, which changes whenever a log is added or
+    removed, so repeated polls of an unchanged directory skip the scan.
+    
+    Args:
+        data_dir: Directory containing log files
+        dir_mtime_ns: Directory modification time (cache key only)
+        
+    Returns:
+        Log file entries, newest first
+    """
     log_files = []
-    for filename in os.listdir(data_dir):
-        if filename.endswith('.json') and filename.startswith('simulation_'):
-            filepath = os.path.join(data_dir, filename)
-            log_files.append({
-                "filename": filename,
-                "path": filepath,
-                "size": os.path.getsize(filepath),
-                "modified": os.path.getmtime(filepath)
-            })
+    with os.scandir(data_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json') and entry.name.startswith('simulation_'):
+                stat = entry.stat()
+                log_files.append({
+                    "filename": entry.name,
+                    "path": entry.path,
+                    "size": stat.st_size,
+                    "modified": stat.st_mtime
+                })
     
     # Sort by modified time (newest first)
     log_files.sort(key=lambda x: x['modified'], reverse=True)
     
-    return {"logs": log_files}
+    return log_files
 
 
 @app.get("/simulation/logs/{filename}")
@@ -225,13 +324,8 @@ async def get_log_file(filename: str):
     Returns:
         Log file contents
     """
-    filepath = os.path.join("data", filename)
-    
-    if not os.path.exists(filepath):
-        raise HTTPException(
-            status_code=404,
-            detail="Log file not found"
-        )
+    data_dir = os.path.realpath("data")
+    filepath = os.path.realpath(os.path.join(data_dir, filename))
     
     if not filename.endswith('.json'):
         raise HTTPException(
@@ -239,14 +333,19 @@ async def get_log_file(filename: str):
             detail="Only JSON log files are supported"
         )
     
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
+    if os.path.dirname(filepath) != data_dir or not os.path.isfile(filepath):
         raise HTTPException(
-            status_code=500,
-            detail=f"Error reading log file: {str(e)}"
+            status_code=404,
+            detail="Log file not found"
         )
+    
+    # Logs are already valid JSON; stream the bytes instead of re-encoding them
+    return FileResponse(
+        filepath,
+        media_type="application/json",
+        filename=filename,
+        content_disposition_type="inline"
+    )
 
 
 @app.get("/health")
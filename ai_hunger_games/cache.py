@@ -0,0 +1,376 @@
+"""
+Prompt cache for AI Hunger Games.
+Short-circuits repeated LLM calls with an exact-match SQLite store and an
+optional embedding-similarity fallback for near-duplicate answer prompts.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+import requests
+from config import (
+    LOG_DIR, OLLAMA_BASE_URL, OLLAMA_TIMEOUT, PROMPT_CACHE_FILE, PROMPT_CACHE_SIMILARITY,
+    PROMPT_CACHE_EMBED_BACKEND, PROMPT_CACHE_EMBED_MODEL, PROMPT_CACHE_OLLAMA_EMBED_MODEL,
+    PROMPT_CACHE_MEMORY_SIZE
+)
+
+try:
+    import numpy as np
+    import faiss
+except ImportError:  # Semantic lookups are optional
+    np = None
+    faiss = None
+
+
+class SemanticIndex:
+    """
+    Cosine-similarity index mapping prompt embeddings to cache keys.
+
+    Vectors are L2-normalized and stored in a FAISS inner-product index,
+    so the inner product of a hit equals its cosine similarity.
+    """
+
+    def __init__(self, embed: Callable[[str], List[float]], threshold: float = PROMPT_CACHE_SIMILARITY):
+        """
+        Initialize an empty index.
+
+        Args:
+            embed: Function turning a text into an embedding vector
+            threshold: Minimum cosine similarity for a match
+        """
+        self.embed = embed
+        self.threshold = threshold
+        self._index = None
+        self._keys: List[str] = []
+
+    def vectorize(self, text: str) -> "np.ndarray":
+        """
+        Embed and normalize a text.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Normalized float32 vector of shape (1, dim)
+        """
+        vector = np.asarray(self.embed(text), dtype=np.float32).reshape(1, -1)
+        faiss.normalize_L2(vector)
+        return vector
+
+    def add(self, key: str, vector: "np.ndarray") -> None:
+        """
+        Add a normalized vector under the given key.
+
+        Args:
+            key: Cache key the vector points to
+            vector: Normalized vector of shape (1, dim)
+        """
+        if self._index is None:
+            self._index = faiss.IndexFlatIP(vector.shape[1])
+        self._index.add(vector)
+        self._keys.append(key)
+
+    def search(self, vector: "np.ndarray") -> Optional[str]:
+        """
+        Find the closest stored key above the similarity threshold.
+
+        Args:
+            vector: Normalized query vector of shape (1, dim)
+
+        Returns:
+            Matching cache key, or None if nothing is similar enough
+        """
+        if self._index is None or not self._keys:
+            return None
+
+        scores, ids = self._index.search(vector, 1)
+        if ids[0][0] >= 0 and scores[0][0] >= self.threshold:
+            return self._keys[ids[0][0]]
+        return None
+
+    def __len__(self) -> int:
+        """Number of vectors in the index."""
+        return len(self._keys)
+
+
+class PromptCache:
+    """
+    Persistent cache of LLM responses keyed by model, temperature and prompt.
+
+    Exact hits are served from a small in-memory LRU, then from SQLite. When
+    FAISS and an embedder (sentence-transformers or Ollama) are available,
+    calls that opt in with `semantic=True` fall back to the most similar
+    stored prompt for the same model. Only free-form answers should opt in:
+    a near-duplicate ballot prompt can list different candidates.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        similarity_threshold: float = PROMPT_CACHE_SIMILARITY,
+        embed_model: Optional[str] = None,
+        memory_size: int = PROMPT_CACHE_MEMORY_SIZE,
+        embed_backend: str = PROMPT_CACHE_EMBED_BACKEND
+    ):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            db_path: Path to the SQLite file (defaults to LOG_DIR/PROMPT_CACHE_FILE)
+            similarity_threshold: Minimum cosine similarity for semantic hits
+            embed_model: Embedding model name (defaults to the backend's configured model)
+            memory_size: Number of responses kept in the in-memory tier
+            embed_backend: "sentence-transformers", "ollama", or "none" to disable semantic hits
+        """
+        if db_path is None:
+            db_path = os.path.join(LOG_DIR, PROMPT_CACHE_FILE)
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self.db_path = db_path
+        self.similarity_threshold = similarity_threshold
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self.memory_hits = 0
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        # Shared between the event loop and worker threads
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, "
+                "response TEXT NOT NULL, embedding BLOB)"
+            )
+            self._conn.commit()
+
+        self._embedder = self._load_embedder(embed_backend, embed_model)
+        self._indexes: Dict[str, SemanticIndex] = {}
+        if self._embedder is not None:
+            self._load_indexes()
+
+    @staticmethod
+    def make_key(prompt: str, model: str, temperature: Optional[float] = None) -> str:
+        """
+        Build the exact-match cache key.
+
+        Args:
+            prompt: Prompt text
+            model: Model name
+            temperature: Sampling temperature, if responses depend on it
+
+        Returns:
+            Hex digest identifying the (model, temperature, prompt) triple
+        """
+        if temperature is None:
+            return hashlib.sha256((model + prompt).encode()).hexdigest()
+        return hashlib.sha256(f"{model}\0{temperature!r}\0{prompt}".encode()).hexdigest()
+
+    def get(
+        self,
+        prompt: str,
+        model: str,
+        temperature: Optional[float] = None,
+        semantic: bool = False
+    ) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            prompt: Prompt text
+            model: Model name
+            temperature: Sampling temperature of the call
+            semantic: Also accept a response to a similar prompt
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        key = self.make_key(prompt, model, temperature)
+
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return response
+
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._remember(key, row[0])
+                self.hits += 1
+                return row[0]
+
+        index = self._indexes.get(model) if semantic else None
+        if index is not None and len(index):
+            # Embed outside the lock; it is the slow part
+            vector = self._vectorize(index, prompt)
+            if vector is not None:
+                with self._lock:
+                    similar_key = index.search(vector)
+                    if similar_key is not None:
+                        row = self._conn.execute(
+                            "SELECT response FROM responses WHERE key = ?", (similar_key,)
+                        ).fetchone()
+                        if row is not None:
+                            self.semantic_hits += 1
+                            return row[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(
+        self,
+        prompt: str,
+        model: str,
+        response: str,
+        temperature: Optional[float] = None,
+        semantic: bool = False
+    ) -> None:
+        """
+        Store a response.
+
+        Args:
+            prompt: Prompt text
+            model: Model name
+            response: Response to cache
+            temperature: Sampling temperature of the call
+            semantic: Index the prompt for similarity lookups
+        """
+        key = self.make_key(prompt, model, temperature)
+
+        vector = None
+        if semantic and self._embedder is not None:
+            vector = self._vectorize(self._index_for(model), prompt)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, embedding) "
+                "VALUES (?, ?, ?, ?)",
+                (key, model, response, vector.tobytes() if vector is not None else None)
+            )
+            self._conn.commit()
+            self._remember(key, response)
+            if vector is not None:
+                self._index_for(model).add(key, vector)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache hit/miss counters.
+
+        Returns:
+            Dictionary with hit and miss counts
+        """
+        return {
+            "memory_hits": self.memory_hits,
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses
+        }
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Database connection, reopened on first use after close() (caller holds the lock)."""
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        return self._db
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection.
+
+        The cache stays usable: the next lookup or store reopens it, so a
+        cache shared across simulations can be closed at the end of each one.
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, response: str) -> None:
+        """Add a response to the in-memory LRU tier (caller holds the lock)."""
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def _vectorize(index: SemanticIndex, prompt: str) -> Optional["np.ndarray"]:
+        """Embed a prompt, treating embedder failures as a cache miss."""
+        try:
+            return index.vectorize(prompt)
+        except Exception as e:
+            print(f"⚠️  Prompt embedding failed: {e}")
+            return None
+
+    def _index_for(self, model: str) -> SemanticIndex:
+        """Get or create the semantic index for a model (safe to call from any thread)."""
+        index = self._indexes.get(model)
+        if index is None:
+            index = self._indexes.setdefault(
+                model, SemanticIndex(self._embedder, self.similarity_threshold)
+            )
+        return index
+
+    def _load_indexes(self) -> None:
+        """Rebuild the in-memory semantic indexes from stored embeddings."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, model, embedding FROM responses WHERE embedding IS NOT NULL"
+            ).fetchall()
+
+        for key, model, blob in rows:
+            vector = np.frombuffer(blob, dtype=np.float32).reshape(1, -1)
+            self._index_for(model).add(key, vector)
+
+    @staticmethod
+    def _load_embedder(
+        embed_backend: str,
+        embed_model: Optional[str]
+    ) -> Optional[Callable[[str], List[float]]]:
+        """
+        Load the embedder if semantic hits are possible.
+
+        Args:
+            embed_backend: "sentence-transformers", "ollama" or "none"
+            embed_model: Embedding model name (None for the backend's default)
+
+        Returns:
+            Embedding function, or None if unavailable
+        """
+        if faiss is None or embed_backend == "none":
+            return None
+
+        if embed_backend == "ollama":
+            embed_model = embed_model or PROMPT_CACHE_OLLAMA_EMBED_MODEL
+            session = requests.Session()
+
+            def embed(text: str) -> List[float]:
+                response = session.post(
+                    f"{OLLAMA_BASE_URL}/api/embeddings",
+                    json={"model": embed_model, "prompt": text},
+                    timeout=OLLAMA_TIMEOUT
+                )
+                response.raise_for_status()
+                return response.json()["embedding"]
+
+            return embed
+
+        embed_model = embed_model or PROMPT_CACHE_EMBED_MODEL
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            return None
+
+        model = SentenceTransformer(embed_model)
+        return lambda text: model.encode(text)
@@ -2,13 +2,22 @@
 Configuration file for AI Hunger Games simulation.
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Union
 
 
 # Ollama Configuration
 OLLAMA_BASE_URL: str = "http://localhost:11434"
 OLLAMA_MODEL: str = "llama3.2:1b"  # Default model for all agents
 OLLAMA_TIMEOUT: int = 120  # Timeout in seconds
+OLLAMA_NUM_PARALLEL: int = 4  # Maximum concurrent requests sent to Ollama
+OLLAMA_MAX_TOKENS: int = 256  # Default generation cap (num_predict)
+OLLAMA_ENDPOINTS: list[str] = [OLLAMA_BASE_URL]  # Ollama servers to spread requests over (round-robin)
+OLLAMA_KEEP_ALIVE: Union[int, str] = -1  # How long Ollama keeps the model loaded (-1 = until restart)
+DEFAULT_STOP_TOKENS: list[str] = ["\n\n", "###"]  # Stop sequences for agent answers
+LLM_MAX_RETRIES: int = 3  # Retries per call on connection errors, 429 and 5xx
+LLM_RETRY_BASE_DELAY: float = 0.25  # First backoff delay in seconds (doubles each retry)
+CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failed calls before a model is skipped
+CIRCUIT_RESET_TIMEOUT: float = 30.0  # Seconds before a skipped model is tried again
 
 # Simulation Configuration
 NUM_AGENTS: int = 8
@@ -43,6 +52,18 @@ LOG_DIR: str = "data"
 LOG_FILE: str = "simulation_log.json"
 CSV_FILE: str = "simulation_results.csv"
 VERBOSE: bool = True
+SNAPSHOT_ROUNDS: bool = True  # Write a gzip/pickle checkpoint after every round
+WARMUP_MODEL: bool = True  # Load the model and prefill agent prompts before round 1
+
+# Prompt Cache Configuration
+PROMPT_CACHE_ENABLED: bool = False  # Answers are sampled, so reuse is opt-in
+PROMPT_CACHE_FILE: str = "prompt_cache.sqlite3"  # Stored under LOG_DIR
+PROMPT_CACHE_SIMILARITY: float = 0.95  # Minimum cosine similarity for semantic hits
+PROMPT_CACHE_EMBED_BACKEND: str = "sentence-transformers"  # Or "ollama" (needs faiss either way)
+PROMPT_CACHE_EMBED_MODEL: str = "all-MiniLM-L6-v2"  # sentence-transformers model
+PROMPT_CACHE_OLLAMA_EMBED_MODEL: str = "mxbai-embed-large"  # Ollama embedding model
+PROMPT_CACHE_MEMORY_SIZE: int = 1024  # Entries kept in the in-memory tier
+PROMPT_CACHE_DETERMINISTIC_ONLY: bool = False  # Only cache temperature=0 calls
 
 # Predefined Questions (optional - can be overridden)
 DEFAULT_QUESTIONS: list[str] = [
@@ -74,8 +95,17 @@ def get_config() -> Dict[str, Any]:
     return {
         "ollama": {
             "base_url": OLLAMA_BASE_URL,
+            "endpoints": OLLAMA_ENDPOINTS,
             "model": OLLAMA_MODEL,
-            "timeout": OLLAMA_TIMEOUT
+            "timeout": OLLAMA_TIMEOUT,
+            "num_parallel": OLLAMA_NUM_PARALLEL,
+            "max_tokens": OLLAMA_MAX_TOKENS,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "stop_tokens": DEFAULT_STOP_TOKENS,
+            "max_retries": LLM_MAX_RETRIES,
+            "retry_base_delay": LLM_RETRY_BASE_DELAY,
+            "circuit_failure_threshold": CIRCUIT_FAILURE_THRESHOLD,
+            "circuit_reset_timeout": CIRCUIT_RESET_TIMEOUT
         },
         "simulation": {
             "num_agents": NUM_AGENTS,
@@ -93,7 +123,19 @@ def get_config() -> Dict[str, Any]:
             "log_dir": LOG_DIR,
             "log_file": LOG_FILE,
             "csv_file": CSV_FILE,
-            "verbose": VERBOSE
+            "verbose": VERBOSE,
+            "snapshot_rounds": SNAPSHOT_ROUNDS,
+            "warmup_model": WARMUP_MODEL
+        },
+        "prompt_cache": {
+            "enabled": PROMPT_CACHE_ENABLED,
+            "file": PROMPT_CACHE_FILE,
+            "similarity": PROMPT_CACHE_SIMILARITY,
+            "embed_backend": PROMPT_CACHE_EMBED_BACKEND,
+            "embed_model": PROMPT_CACHE_EMBED_MODEL,
+            "ollama_embed_model": PROMPT_CACHE_OLLAMA_EMBED_MODEL,
+            "memory_size": PROMPT_CACHE_MEMORY_SIZE,
+            "deterministic_only": PROMPT_CACHE_DETERMINISTIC_ONLY
         },
         "memory": {
             "max_size": MAX_MEMORY_SIZE
@@ -5,12 +5,81 @@ Handles agent elimination and creation of evolved agents.
 
 
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 import random
+import re
 from agent import Agent
+from agent_pool import AgentPool
+from _fastpath import sample_mutation_indices
+from logger import truncate
 from config import MUTATION_TRAITS, MUTATION_RATE
 
 
+# Name parts for evolved agents
+_EVOLUTION_SUFFIXES = (
+    "Evolved", "2.0", "Redux", "Reborn", "Neo",
+    "Next", "Prime", "Enhanced", "Advanced", "Plus"
+)
+_NAME_ADJECTIVES = (
+    "Adaptive", "Strategic", "Resilient", "Dynamic", "Innovative",
+    "Insightful", "Cunning", "Wise", "Bold", "Swift"
+)
+_NAME_NOUNS = (
+    "Thinker", "Scholar", "Mind", "Sage", "Oracle",
+    "Strategist", "Visionary", "Pioneer", "Master", "Expert"
+)
+
+
+class AliasSampler:
+    """
+    Weighted sampler using Vose's alias method.
+    
+    Building the table is O(n); every draw afterwards is O(1), versus the
+    O(n) cumulative sum random.choices() redoes on each call.
+    """
+    
+    def __init__(self, items: Sequence[Any], weights: Sequence[float]):
+        """
+        Build the alias table.
+        
+        Args:
+            items: Items to sample from
+            weights: Positive weight per item
+        """
+        n = len(items)
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        
+        self.items = list(items)
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        
+        # Leftovers are 1.0 up to rounding error and keep prob 1.0
+    
+    def pick(self) -> Any:
+        """
+        Draw one item.
+        
+        Returns:
+            Item chosen with probability proportional to its weight
+        """
+        i = random.randrange(len(self.items))
+        if random.random() < self.prob[i]:
+            return self.items[i]
+        return self.items[self.alias[i]]
+
+
 class EvolutionManager:
     """
     Manages the evolution process: elimination and creation of new agents.
@@ -33,6 +102,16 @@ class EvolutionManager:
         self.mutation_traits = mutation_traits or MUTATION_TRAITS
         self.elimination_history: List[Dict[str, Any]] = []
         self.creation_history: List[Dict[str, Any]] = []
+        
+        # One alternation scans a personality for every trait in a single pass
+        self._mutation_traits_lower = [trait.lower() for trait in self.mutation_traits]
+        self._mutation_regex = re.compile("|".join(
+            re.escape(trait) for trait in sorted(self._mutation_traits_lower, key=len, reverse=True)
+        ))
+        
+        # Parent sampler, rebuilt when the population or its selection weights change
+        self._alias_sampler: Optional[AliasSampler] = None
+        self._alias_key: Optional[Tuple] = None
     
     def eliminate_agent(
         self,
@@ -70,7 +149,7 @@ class EvolutionManager:
                 "votes_received": eliminated_agent.votes_received,
                 "answers_given": eliminated_agent.answers_given,
                 "reason": reason,
-                "personality": eliminated_agent.personality_prompt[:200] + "..."
+                "agent_ref": eliminated_agent
             }
             
             self.elimination_history.append(elimination_record)
@@ -87,7 +166,8 @@ class EvolutionManager:
         existing_agents: List[Agent],
         round_num: int,
         model: str = "llama2",
-        base_name: Optional[str] = None
+        base_name: Optional[str] = None,
+        pool: Optional[AgentPool] = None
     ) -> Agent:
         """
         Create a new evolved agent based on existing successful agents.
@@ -97,6 +177,7 @@ class EvolutionManager:
             round_num: Current round number
             model: Ollama model to use
             base_name: Base name for the new agent (optional)
+            pool: Stats pool to register the new agent in (optional)
             
         Returns:
             Newly created evolved agent
@@ -120,7 +201,8 @@ class EvolutionManager:
             model=model,
             generation=parent.generation + 1,
             parent_name=parent.name,
-            birth_round=round_num
+            birth_round=round_num,
+            pool=pool
         )
         
         # Record creation
@@ -129,7 +211,7 @@ class EvolutionManager:
             "agent_name": new_agent.name,
             "generation": new_agent.generation,
             "parent": parent.name,
-            "personality": new_personality[:200] + "...",
+            "agent_ref": new_agent,
             "mutations_applied": self._extract_mutations(new_personality)
         }
         
@@ -152,15 +234,44 @@ class EvolutionManager:
         Returns:
             Selected parent agent
         """
-        # Weight by votes received (successful agents more likely to be parents)
-        weights = [agent.votes_received + 1 for agent in agents]  # +1 to avoid zero weights
+        # Rebuild only when the population or a value feeding the weights changed;
+        # other stat writes (votes cast, answers given) leave the table valid
+        key = tuple(
+            (id(agent), agent.votes_received, agent.rounds_survived) for agent in agents
+        )
+        if key != self._alias_key:
+            self._alias_sampler = self._build_parent_sampler(agents)
+            self._alias_key = key
         
-        # If all weights are equal, also consider rounds survived
-        if len(set(weights)) == 1:
-            weights = [agent.rounds_survived + 1 for agent in agents]
+        if self._alias_sampler is None:
+            return random.choice(agents)
+        return self._alias_sampler.pick()
+    
+    def _build_parent_sampler(self, agents: List[Agent]) -> Optional[AliasSampler]:
+        """
+        Build the weighted parent sampler for the current population.
         
-        parent = random.choices(agents, weights=weights, k=1)[0]
-        return parent
+        Args:
+            agents: List of agents to select from
+            
+        Returns:
+            Alias sampler, or None if every agent is equally likely
+        """
+        # Weight by votes received (successful agents more likely to be parents),
+        # with rounds survived as the tie-breaker; +1 avoids zero weights
+        vote_weights = []
+        round_weights = []
+        for agent in agents:
+            vote_weights.append(agent.votes_received + 1)
+            round_weights.append(agent.rounds_survived + 1)
+        
+        for weights in (vote_weights, round_weights):
+            first = weights[0]
+            if not all(w == first for w in weights):
+                return AliasSampler(agents, weights)
+        
+        # All weights equal: uniform choice needs no table
+        return None
     
     def _evolve_personality(self, parent: Agent) -> str:
         """
@@ -172,27 +283,21 @@ class EvolutionManager:
         Returns:
             New evolved personality prompt
         """
-        # Start with parent's personality
-        evolved_personality = parent.personality_prompt
-        
-        # Apply mutations
-        if random.random() < self.mutation_rate:
-            num_mutations = random.randint(1, 3)
-            selected_traits = random.sample(
-                self.mutation_traits, 
-                min(num_mutations, len(self.mutation_traits))
+        # Apply mutations on top of the parent's personality
+        indices = sample_mutation_indices(len(self.mutation_traits), self.mutation_rate, 3)
+        if indices:
+            selected_traits = ", ".join(self.mutation_traits[i] for i in indices)
+            return (
+                f"{parent.personality_prompt}\n\nEvolved traits: "
+                f"You have evolved to be {selected_traits}. "
+                "You inherit your parent's core values but express them through these new traits."
             )
-            
-            mutation_text = "\n\nEvolved traits: "
-            mutation_text += f"You have evolved to be {', '.join(selected_traits)}. "
-            mutation_text += f"You inherit your parent's core values but express them through these new traits."
-            
-            evolved_personality += mutation_text
-        else:
-            # Minor refinement without major mutations
-            evolved_personality += "\n\nYou are a refined version of your predecessor, maintaining their core philosophy."
         
-        return evolved_personality
+        # Minor refinement without major mutations
+        return (
+            f"{parent.personality_prompt}\n\n"
+            "You are a refined version of your predecessor, maintaining their core philosophy."
+        )
     
     def _generate_evolved_name(self, parent: Agent, base_name: Optional[str] = None) -> str:
         """
@@ -209,29 +314,15 @@ class EvolutionManager:
             return f"{base_name} II"
         
         # Generate evolved name variants
-        evolution_suffixes = [
-            "Evolved", "2.0", "Redux", "Reborn", "Neo",
-            "Next", "Prime", "Enhanced", "Advanced", "Plus"
-        ]
-        
-        suffix = random.choice(evolution_suffixes)
+        suffix = random.choice(_EVOLUTION_SUFFIXES)
         
         # Sometimes use parent name, sometimes modify it
         if random.random() < 0.6:
             return f"{parent.name} {suffix}"
         else:
             # Create a variant name
-            adjectives = [
-                "Adaptive", "Strategic", "Resilient", "Dynamic", "Innovative",
-                "Insightful", "Cunning", "Wise", "Bold", "Swift"
-            ]
-            nouns = [
-                "Thinker", "Scholar", "Mind", "Sage", "Oracle",
-                "Strategist", "Visionary", "Pioneer", "Master", "Expert"
-            ]
-            
-            adj = random.choice(adjectives)
-            noun = random.choice(nouns)
+            adj = random.choice(_NAME_ADJECTIVES)
+            noun = random.choice(_NAME_NOUNS)
             return f"The {adj} {noun}"
     
     def _extract_mutations(self, personality: str) -> List[str]:
@@ -244,11 +335,11 @@ class EvolutionManager:
         Returns:
             List of mutation traits found
         """
-        mutations = []
-        for trait in self.mutation_traits:
-            if trait in personality.lower():
-                mutations.append(trait)
-        return mutations
+        found = set(self._mutation_regex.findall(personality.lower()))
+        return [
+            trait for trait, lowered in zip(self.mutation_traits, self._mutation_traits_lower)
+            if lowered in found
+        ]
     
     def get_evolution_summary(self) -> str:
         """
@@ -257,25 +348,49 @@ class EvolutionManager:
         Returns:
             Formatted evolution history string
         """
-        summary = "\n" + "="*60 + "\n"
-        summary += "🧬 EVOLUTION HISTORY\n"
-        summary += "="*60 + "\n\n"
+        parts = [
+            "\n", "="*60, "\n",
+            "🧬 EVOLUTION HISTORY\n",
+            "="*60, "\n\n",
+            f"Total Eliminations: {len(self.elimination_history)}\n",
+            f"Total New Agents: {len(self.creation_history)}\n\n",
+            "Elimination Timeline:\n"
+        ]
+        parts.extend(
+            f"  Round {record['round']}: {record['agent_name']} "
+            f"(Gen {record['generation']}, survived {record['rounds_survived']} rounds)\n"
+            for record in self.elimination_history
+        )
         
-        summary += f"Total Eliminations: {len(self.elimination_history)}\n"
-        summary += f"Total New Agents: {len(self.creation_history)}\n\n"
+        parts.append("\nCreation Timeline:\n")
+        parts.extend(
+            f"  Round {record['round']}: {record['agent_name']} "
+            f"(Gen {record['generation']}, parent: {record['parent']})\n"
+            for record in self.creation_history
+        )
         
-        summary += "Elimination Timeline:\n"
-        for record in self.elimination_history:
-            summary += f"  Round {record['round']}: {record['agent_name']} "
-            summary += f"(Gen {record['generation']}, survived {record['rounds_survived']} rounds)\n"
+        parts.extend(["\n", "="*60, "\n"])
+        return "".join(parts)
+    
+    def get_history(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Export the elimination and creation records.
         
-        summary += "\nCreation Timeline:\n"
-        for record in self.creation_history:
-            summary += f"  Round {record['round']}: {record['agent_name']} "
-            summary += f"(Gen {record['generation']}, parent: {record['parent']})\n"
+        Records keep a reference to their agent; the personality excerpt is
+        only built here, when the history is actually exported.
         
-        summary += "\n" + "="*60 + "\n"
-        return summary
+        Returns:
+            Dictionary with "eliminations" and "creations" record lists
+        """
+        def export(record: Dict[str, Any]) -> Dict[str, Any]:
+            exported = {key: value for key, value in record.items() if key != "agent_ref"}
+            exported["personality"] = truncate(record["agent_ref"].personality_prompt, 200)
+            return exported
+        
+        return {
+            "eliminations": [export(record) for record in self.elimination_history],
+            "creations": [export(record) for record in self.creation_history]
+        }
     
     def get_generation_stats(self, agents: List[Agent]) -> Dict[str, Any]:
         """
@@ -307,20 +422,16 @@ class EvolutionManager:
         Returns:
             List of ancestor names from oldest to newest
         """
+        # Name -> agent, keeping the earliest agent when names repeat
+        by_name = {historical_agent.name: historical_agent for historical_agent in reversed(all_history)}
+        
         lineage = [agent.name]
         current = agent
         
         while current.parent_name:
             lineage.append(current.parent_name)
-            # Find parent in history
-            parent_found = False
-            for historical_agent in all_history:
-                if historical_agent.name == current.parent_name:
-                    current = historical_agent
-                    parent_found = True
-                    break
-            
-            if not parent_found:
+            current = by_name.get(current.parent_name)
+            if current is None:
                 break
         
         return list(reversed(lineage))
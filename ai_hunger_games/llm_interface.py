@@ -3,11 +3,27 @@ LLM Interface for communicating with Ollama API.
 Handles all interactions with the Ollama language models.
 """
 
+import asyncio
+import itertools
 import requests
-from typing import Optional, Dict, Any
+import httpx
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, Any, AsyncIterator, Callable, List, Tuple, Union
 import json
 import time
-from config import OLLAMA_BASE_URL, OLLAMA_TIMEOUT
+from config import (
+    OLLAMA_BASE_URL, OLLAMA_ENDPOINTS, OLLAMA_TIMEOUT, OLLAMA_NUM_PARALLEL, OLLAMA_MAX_TOKENS, OLLAMA_KEEP_ALIVE,
+    LLM_MAX_RETRIES, LLM_RETRY_BASE_DELAY, PROMPT_CACHE_ENABLED, PROMPT_CACHE_DETERMINISTIC_ONLY
+)
+from cache import PromptCache
+from resilience import CircuitBreaker, CircuitOpenError, RETRY_STATUS_CODES, backoff_delay
+
+try:
+    import h2  # noqa: F401  (lets httpx negotiate HTTP/2)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
 
 
 class LLMInterface:
@@ -17,19 +33,66 @@ class LLMInterface:
     Handles prompt generation, API communication, and response parsing.
     """
     
-    def __init__(self, base_url: str = OLLAMA_BASE_URL, timeout: int = OLLAMA_TIMEOUT):
+    def __init__(
+        self,
+        base_url: str = OLLAMA_BASE_URL,
+        timeout: int = OLLAMA_TIMEOUT,
+        max_concurrent: int = OLLAMA_NUM_PARALLEL,
+        cache: Optional[PromptCache] = None,
+        cache_deterministic_only: bool = PROMPT_CACHE_DETERMINISTIC_ONLY,
+        max_retries: int = LLM_MAX_RETRIES,
+        retry_base_delay: float = LLM_RETRY_BASE_DELAY,
+        keep_alive: Union[int, str] = OLLAMA_KEEP_ALIVE,
+        endpoints: Optional[List[str]] = None
+    ):
         """
         Initialize the LLM interface.
         
         Args:
             base_url: Base URL for Ollama API
             timeout: Request timeout in seconds
+            max_concurrent: Maximum number of in-flight async requests
+            cache: Optional prompt cache consulted before calling Ollama
+            cache_deterministic_only: Only use the cache for temperature=0 calls
+            max_retries: Retries per request on connection errors, 429 and 5xx
+            retry_base_delay: First backoff delay in seconds
+            keep_alive: How long Ollama keeps the model loaded after a request
+            endpoints: Ollama servers to spread generation requests over
+                round-robin (defaults to just `base_url`)
         """
-        self.base_url = base_url.rstrip('/')
+        self.endpoints = [url.rstrip('/') for url in endpoints] if endpoints else [base_url.rstrip('/')]
+        self.base_url = self.endpoints[0]
+        self._endpoint_cycle = itertools.cycle(self.endpoints)
         self.timeout = timeout
+        self.max_concurrent = max_concurrent
+        self.cache = cache
+        self.cache_deterministic_only = cache_deterministic_only
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.keep_alive = keep_alive
         self.total_requests = 0
         self.failed_requests = 0
         
+        # One breaker per model and endpoint, so a failing model or server
+        # doesn't slow down the others
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        
+        # Async state is bound to the event loop it was created on
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_semaphores: Dict[str, asyncio.Semaphore] = {}
+        
+        # One keep-alive session for the sync paths; retries are handled here
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=len(self.endpoints),
+            pool_maxsize=max_concurrent,
+            max_retries=Retry(total=0)
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update({"Connection": "keep-alive"})
+        
     def check_connection(self) -> bool:
         """
         Check if Ollama is running and accessible.
@@ -38,7 +101,7 @@ class LLMInterface:
             True if connection successful, False otherwise
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=5)
             return response.status_code == 200
         except Exception as e:
             print(f"❌ Ollama connection failed: {e}")
@@ -52,7 +115,7 @@ class LLMInterface:
             List of model names
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self._session.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 return [model['name'] for model in data.get('models', [])]
@@ -65,7 +128,11 @@ class LLMInterface:
         prompt: str,
         model: str = "llama2",
         temperature: float = 0.7,
-        max_tokens: Optional[int] = None
+        max_tokens: Optional[int] = OLLAMA_MAX_TOKENS,
+        options: Optional[Dict[str, Any]] = None,
+        stop: Optional[List[str]] = None,
+        semantic: bool = False,
+        format: Optional[Union[str, Dict[str, Any]]] = None
     ) -> str:
         """
         Generate text using Ollama API.
@@ -75,42 +142,101 @@ class LLMInterface:
             model: Model name to use
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens to generate (None for unlimited)
+            options: Extra Ollama model options (e.g. num_keep)
+            stop: Sequences that end generation early
+            semantic: Allow prompt-cache hits from similar prompts (free-form answers only)
+            format: Constrain the output to "json" or to a JSON schema
             
         Returns:
             Generated text response
         """
+        cache_prompt = prompt if format is None else f"{prompt}\n{json.dumps(format, sort_keys=True)}"
+        cached = self._cache_get(cache_prompt, model, temperature, semantic)
+        if cached is not None:
+            return cached
+        
         self.total_requests += 1
         
-        url = f"{self.base_url}/api/generate"
+        payload = self._build_generate_payload(
+            prompt, model, temperature, max_tokens, options, stop, format
+        )
         
-        payload = {
-            "model": model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": temperature
-            }
-        }
+        try:
+            response = self._post("/api/generate", payload)
+            
+            if response.status_code == 200:
+                data = response.json()
+                result = data.get("response", "").strip()
+                self._cache_put(cache_prompt, model, temperature, result, semantic)
+                return result
+            else:
+                self.failed_requests += 1
+                print(f"❌ API Error {response.status_code}: {response.text}")
+                return f"[Error: API returned status {response.status_code}]"
+                
+        except requests.exceptions.Timeout:
+            self.failed_requests += 1
+            print(f"❌ Request timeout after {self.timeout} seconds")
+            return "[Error: Request timeout]"
+        except Exception as e:
+            self.failed_requests += 1
+            print(f"❌ Generation failed: {e}")
+            return f"[Error: {str(e)}]"
+    
+    async def agenerate(
+        self,
+        prompt: str,
+        model: str = "llama2",
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = OLLAMA_MAX_TOKENS,
+        options: Optional[Dict[str, Any]] = None,
+        stop: Optional[List[str]] = None,
+        semantic: bool = False,
+        format: Optional[Union[str, Dict[str, Any]]] = None
+    ) -> str:
+        """
+        Generate text using Ollama API without blocking the event loop.
         
-        if max_tokens:
-            payload["options"]["num_predict"] = max_tokens
+        Concurrent calls are capped at `max_concurrent` in-flight requests.
+        
+        Args:
+            prompt: The prompt to send to the model
+            model: Model name to use
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum tokens to generate (None for unlimited)
+            options: Extra Ollama model options (e.g. num_keep)
+            stop: Sequences that end generation early
+            semantic: Allow prompt-cache hits from similar prompts (free-form answers only)
+            format: Constrain the output to "json" or to a JSON schema
+            
+        Returns:
+            Generated text response
+        """
+        cache_prompt = prompt if format is None else f"{prompt}\n{json.dumps(format, sort_keys=True)}"
+        cached = await self._acache_get(cache_prompt, model, temperature, semantic)
+        if cached is not None:
+            return cached
+        
+        self.total_requests += 1
+        
+        payload = self._build_generate_payload(
+            prompt, model, temperature, max_tokens, options, stop, format
+        )
         
         try:
-            response = requests.post(
-                url,
-                json=payload,
-                timeout=self.timeout
-            )
+            response = await self._apost("/api/generate", payload)
             
             if response.status_code == 200:
                 data = response.json()
-                return data.get("response", "").strip()
+                result = data.get("response", "").strip()
+                await self._acache_put(cache_prompt, model, temperature, result, semantic)
+                return result
             else:
                 self.failed_requests += 1
                 print(f"❌ API Error {response.status_code}: {response.text}")
                 return f"[Error: API returned status {response.status_code}]"
                 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             self.failed_requests += 1
             print(f"❌ Request timeout after {self.timeout} seconds")
             return "[Error: Request timeout]"
@@ -119,21 +245,481 @@ class LLMInterface:
             print(f"❌ Generation failed: {e}")
             return f"[Error: {str(e)}]"
     
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        model: str = "llama2",
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = OLLAMA_MAX_TOKENS,
+        options: Optional[Dict[str, Any]] = None,
+        stop: Optional[List[str]] = None,
+        format: Optional[Union[str, Dict[str, Any]]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate text using Ollama API, yielding it piece by piece as it is produced.
+        
+        Closing the iterator early (aclose) drops the connection, which stops
+        generation on the server. A cached response is yielded whole, and a
+        stream read to the end is cached. Streams are not retried; a failed
+        call yields a single "[Error: ...]" chunk instead.
+        
+        Args:
+            prompt: The prompt to send to the model
+            model: Model name to use
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum tokens to generate (None for unlimited)
+            options: Extra Ollama model options (e.g. num_keep)
+            stop: Sequences that end generation early
+            format: Constrain the output to "json" or to a JSON schema
+            
+        Yields:
+            Successive pieces of the generated text
+        """
+        cache_prompt = prompt if format is None else f"{prompt}\n{json.dumps(format, sort_keys=True)}"
+        cached = await self._acache_get(cache_prompt, model, temperature)
+        if cached is not None:
+            yield cached
+            return
+        
+        self.total_requests += 1
+        
+        payload = self._build_generate_payload(
+            prompt, model, temperature, max_tokens, options, stop, format
+        )
+        payload["stream"] = True
+        
+        breaker: Optional[CircuitBreaker] = None
+        parts: List[str] = []
+        try:
+            endpoint, breaker = self._select_endpoint(model)
+            client, semaphores = self._get_async_state()
+            
+            async with semaphores[endpoint]:
+                async with client.stream("POST", endpoint + "/api/generate", json=payload) as response:
+                    if response.status_code != 200:
+                        await response.aread()
+                        if response.status_code in RETRY_STATUS_CODES:
+                            breaker.record_failure()
+                        else:
+                            breaker.record_success()
+                        self.failed_requests += 1
+                        print(f"❌ API Error {response.status_code}: {response.text}")
+                        yield f"[Error: API returned status {response.status_code}]"
+                        return
+                    
+                    # Only a stream read without error counts as a success; a
+                    # server can send 200 headers and then fail mid-body
+                    done = False
+                    try:
+                        async for line in response.aiter_lines():
+                            if not line:
+                                continue
+                            chunk = json.loads(line)
+                            text = chunk.get("response", "")
+                            if text:
+                                parts.append(text)
+                                yield text
+                            if chunk.get("done"):
+                                done = True
+                                break
+                    except GeneratorExit:
+                        # The caller stopped reading; everything received so far was fine
+                        breaker.record_success()
+                        raise
+                    if not done:
+                        raise httpx.RemoteProtocolError("Stream ended before generation finished")
+                    breaker.record_success()
+            
+            await self._acache_put(cache_prompt, model, temperature, "".join(parts).strip())
+            
+        except httpx.TimeoutException:
+            breaker.record_failure()
+            self.failed_requests += 1
+            print(f"❌ Request timeout after {self.timeout} seconds")
+            yield "[Error: Request timeout]"
+        except (httpx.TransportError, ValueError) as e:
+            # Connection or read failures, and malformed stream lines
+            breaker.record_failure()
+            self.failed_requests += 1
+            print(f"❌ Generation failed: {e}")
+            yield f"[Error: {str(e)}]"
+        except Exception as e:
+            self.failed_requests += 1
+            print(f"❌ Generation failed: {e}")
+            yield f"[Error: {str(e)}]"
+    
+    async def agenerate_batch(
+        self,
+        prompts: List[Tuple[str, str]],
+        options: Optional[List[Optional[Dict[str, Any]]]] = None,
+        semantic: bool = False
+    ) -> List[str]:
+        """
+        Generate responses for many (prompt, model) pairs concurrently.
+        
+        All requests share one pooled keep-alive client, so connection setup
+        is paid once per batch rather than once per prompt.
+        
+        Args:
+            prompts: List of (prompt, model) tuples
+            options: Optional per-prompt Ollama options, parallel to `prompts`
+            semantic: Allow prompt-cache hits from similar prompts
+            
+        Returns:
+            Responses in the same order as `prompts`
+        """
+        if options is None:
+            options = [None] * len(prompts)
+        
+        return list(await asyncio.gather(*[
+            self.agenerate(prompt, model, options=prompt_options, semantic=semantic)
+            for (prompt, model), prompt_options in zip(prompts, options)
+        ]))
+    
+    def generate_batch(
+        self,
+        prompts: List[Tuple[str, str]],
+        options: Optional[List[Optional[Dict[str, Any]]]] = None,
+        semantic: bool = False
+    ) -> List[str]:
+        """
+        Synchronous wrapper around agenerate_batch.
+        
+        Must not be called from inside a running event loop.
+        
+        Args:
+            prompts: List of (prompt, model) tuples
+            options: Optional per-prompt Ollama options, parallel to `prompts`
+            semantic: Allow prompt-cache hits from similar prompts
+            
+        Returns:
+            Responses in the same order as `prompts`
+        """
+        async def run() -> List[str]:
+            try:
+                return await self.agenerate_batch(prompts, options, semantic)
+            finally:
+                await self.aclose()
+        
+        return asyncio.run(run())
+    
+    async def awarm(
+        self,
+        prompts: List[str],
+        model: str,
+        options: Optional[List[Optional[Dict[str, Any]]]] = None
+    ) -> int:
+        """
+        Load a model and prefill prompt prefixes ahead of real traffic.
+        
+        Each prompt is sent with num_predict=1, so Ollama loads the model and
+        evaluates the prompt but generates almost nothing. Warm-up calls skip
+        the prompt cache and request stats, and failures are ignored.
+        
+        Args:
+            prompts: Prompt prefixes to prefill
+            model: Model name to warm
+            options: Optional per-prompt Ollama options, parallel to `prompts`
+            
+        Returns:
+            Number of prompts that were prefilled successfully
+        """
+        if options is None:
+            options = [None] * len(prompts)
+        
+        async def warm(prompt: str, prompt_options: Optional[Dict[str, Any]]) -> bool:
+            payload = self._build_generate_payload(prompt, model, 0.0, None, prompt_options)
+            payload["options"]["num_predict"] = 1
+            try:
+                response = await self._apost("/api/generate", payload)
+                return response.status_code == 200
+            except Exception:
+                return False
+        
+        results = await asyncio.gather(*[
+            warm(prompt, prompt_options) for prompt, prompt_options in zip(prompts, options)
+        ])
+        return sum(results)
+    
+    @staticmethod
+    def write_batch_file(prompts: List[Tuple[str, str]], filepath: str) -> str:
+        """
+        Write (prompt, model) pairs as a JSONL batch file for offline runs.
+        
+        Args:
+            prompts: List of (prompt, model) tuples
+            filepath: Path of the JSONL file to write
+            
+        Returns:
+            Path to the written file
+        """
+        with open(filepath, 'w', encoding='utf-8') as f:
+            for prompt, model in prompts:
+                f.write(json.dumps({"model": model, "prompt": prompt}, ensure_ascii=False) + "\n")
+        return filepath
+    
+    def run_batch_file(self, input_path: str, output_path: str) -> int:
+        """
+        Process a JSONL batch file in one shot and write the responses.
+        
+        Each input line is {"model": ..., "prompt": ...}; each output line
+        repeats it with an added "response" field, in the same order.
+        
+        Args:
+            input_path: JSONL file produced by write_batch_file
+            output_path: Path of the JSONL results file
+            
+        Returns:
+            Number of requests processed
+        """
+        with open(input_path, 'r', encoding='utf-8') as f:
+            requests_in = [json.loads(line) for line in f if line.strip()]
+        
+        responses = self.generate_batch(
+            [(item["prompt"], item["model"]) for item in requests_in]
+        )
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            for item, response in zip(requests_in, responses):
+                item["response"] = response
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        
+        return len(requests_in)
+    
+    def _post(self, path: str, payload: Dict[str, Any]) -> requests.Response:
+        """
+        POST to the next Ollama endpoint, retrying transient failures behind its breaker.
+        
+        Connection errors, 429 and 5xx responses are retried with jittered
+        exponential backoff, on the next endpoint when there are several.
+        Read timeouts are not retried, since a slow generation is likely to
+        be slow again.
+        
+        Args:
+            path: API path, e.g. "/api/generate"
+            payload: JSON body (must include "model")
+            
+        Returns:
+            The final response (possibly a retryable error status)
+            
+        Raises:
+            CircuitOpenError: If the model's circuit is open on every endpoint
+            requests.exceptions.RequestException: If the request keeps failing
+        """
+        endpoint, breaker = self._select_endpoint(payload["model"])
+        
+        for attempt in range(self.max_retries + 1):
+            if attempt and len(self.endpoints) > 1:
+                # Fail over: charge the failed server and retry on the next one
+                breaker.record_failure()
+                endpoint, breaker = self._select_endpoint(payload["model"])
+            
+            try:
+                response = self._session.post(endpoint + path, json=payload, timeout=self.timeout)
+            except requests.exceptions.ConnectionError:
+                if attempt == self.max_retries:
+                    breaker.record_failure()
+                    raise
+            except requests.exceptions.Timeout:
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    breaker.record_success()
+                    return response
+                if attempt == self.max_retries:
+                    breaker.record_failure()
+                    return response
+            
+            time.sleep(backoff_delay(attempt, self.retry_base_delay))
+    
+    async def _apost(self, path: str, payload: Dict[str, Any]) -> httpx.Response:
+        """
+        Async version of _post; holds one of the endpoint's concurrency slots
+        only while sending.
+        
+        Args:
+            path: API path, e.g. "/api/generate"
+            payload: JSON body (must include "model")
+            
+        Returns:
+            The final response (possibly a retryable error status)
+            
+        Raises:
+            CircuitOpenError: If the model's circuit is open on every endpoint
+            httpx.TransportError: If the request keeps failing
+        """
+        endpoint, breaker = self._select_endpoint(payload["model"])
+        client, semaphores = self._get_async_state()
+        
+        for attempt in range(self.max_retries + 1):
+            if attempt and len(self.endpoints) > 1:
+                # Fail over: charge the failed server and retry on the next one
+                breaker.record_failure()
+                endpoint, breaker = self._select_endpoint(payload["model"])
+            
+            try:
+                async with semaphores[endpoint]:
+                    response = await client.post(endpoint + path, json=payload)
+            except httpx.TimeoutException:
+                breaker.record_failure()
+                raise
+            except httpx.TransportError:
+                if attempt == self.max_retries:
+                    breaker.record_failure()
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    breaker.record_success()
+                    return response
+                if attempt == self.max_retries:
+                    breaker.record_failure()
+                    return response
+            
+            await asyncio.sleep(backoff_delay(attempt, self.retry_base_delay))
+    
+    def _select_endpoint(self, model: str) -> Tuple[str, CircuitBreaker]:
+        """
+        Pick the next endpoint round-robin, skipping ones whose circuit is open.
+        
+        Args:
+            model: Model name
+            
+        Returns:
+            Tuple of (endpoint base URL, its breaker for the model)
+            
+        Raises:
+            CircuitOpenError: If the model's circuit is open on every endpoint
+        """
+        for _ in range(len(self.endpoints)):
+            endpoint = next(self._endpoint_cycle)
+            # Single-endpoint setups keep plain model names in the stats
+            key = model if len(self.endpoints) == 1 else f"{model} @ {endpoint}"
+            breaker = self._breakers.setdefault(key, CircuitBreaker())
+            if breaker.allow():
+                return endpoint, breaker
+        
+        raise CircuitOpenError(f"Circuit open for model '{model}'")
+    
+    def close(self) -> None:
+        """Release the pooled connections of the sync HTTP session."""
+        self._session.close()
+    
+    def __enter__(self) -> "LLMInterface":
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+    
+    async def aclose(self) -> None:
+        """Close the async HTTP client, if one was created."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+        self._async_loop = None
+        self._async_client = None
+        self._async_semaphores = {}
+    
+    def _get_async_state(self) -> tuple[httpx.AsyncClient, Dict[str, asyncio.Semaphore]]:
+        """
+        Get the async client and concurrency limiter for the running event loop.
+        
+        Both are tied to the loop that created them, so they are rebuilt when
+        the interface is reused from a new loop (e.g. successive asyncio.run calls).
+        
+        Returns:
+            Tuple of (async HTTP client, concurrency semaphore per endpoint)
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            self._async_loop = loop
+            # HTTP/2 is only negotiated over TLS; a local Ollama speaks HTTP/1.1
+            http2 = _HTTP2_AVAILABLE and any(url.startswith("https://") for url in self.endpoints)
+            self._async_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout, connect=10),
+                transport=httpx.AsyncHTTPTransport(
+                    http2=http2,
+                    retries=0,  # _apost and the circuit breakers own retries
+                    limits=httpx.Limits(
+                        max_keepalive_connections=self.max_concurrent * len(self.endpoints),
+                        keepalive_expiry=30
+                    )
+                )
+            )
+            # Each Ollama server queues past its own OLLAMA_NUM_PARALLEL
+            self._async_semaphores = {
+                url: asyncio.Semaphore(self.max_concurrent) for url in self.endpoints
+            }
+        return self._async_client, self._async_semaphores
+    
+    def _build_generate_payload(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: Optional[int],
+        options: Optional[Dict[str, Any]] = None,
+        stop: Optional[List[str]] = None,
+        format: Optional[Union[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the request body for the /api/generate endpoint.
+        
+        Args:
+            prompt: The prompt to send to the model
+            model: Model name to use
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate (None for unlimited)
+            options: Extra Ollama model options
+            stop: Sequences that end generation early
+            format: Constrain the output to "json" or to a JSON schema
+            
+        Returns:
+            JSON-serializable payload dictionary
+        """
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": temperature
+            }
+        }
+        
+        if max_tokens:
+            payload["options"]["num_predict"] = max_tokens
+        
+        if stop:
+            payload["options"]["stop"] = stop
+        
+        if options:
+            payload["options"].update(options)
+        
+        if format is not None:
+            payload["format"] = format
+        
+        return payload
+    
     def generate_with_retry(
         self,
         prompt: str,
         model: str = "llama2",
         max_retries: int = 3,
-        retry_delay: float = 2.0
+        retry_delay: float = 2.0,
+        max_backoff: float = 30.0
     ) -> str:
         """
         Generate text with automatic retry on failure.
         
+        Waits grow exponentially with ±25% jitter so agents that failed
+        together do not all retry at the same moment.
+        
         Args:
             prompt: The prompt to send
             model: Model name to use
             max_retries: Maximum number of retry attempts
-            retry_delay: Delay between retries in seconds
+            retry_delay: Base delay before the first retry in seconds
+            max_backoff: Upper bound on any single delay in seconds
             
         Returns:
             Generated text response
@@ -146,14 +732,16 @@ class LLMInterface:
             
             if attempt < max_retries - 1:
                 print(f"⚠️  Retry attempt {attempt + 1}/{max_retries - 1}")
-                time.sleep(retry_delay)
+                time.sleep(backoff_delay(attempt, retry_delay, max_backoff))
         
         return result
     
     def chat(
         self,
         messages: list[Dict[str, str]],
-        model: str = "llama2"
+        model: str = "llama2",
+        temperature: float = 0.7,
+        options: Optional[Dict[str, Any]] = None
     ) -> str:
         """
         Use chat endpoint for multi-turn conversations.
@@ -161,26 +749,76 @@ class LLMInterface:
         Args:
             messages: List of message dictionaries with 'role' and 'content'
             model: Model name to use
+            temperature: Sampling temperature (0.0 to 1.0)
+            options: Extra Ollama model options
             
         Returns:
             Generated response
         """
+        cache_prompt = self._chat_cache_prompt(messages)
+        cached = self._cache_get(cache_prompt, model, temperature)
+        if cached is not None:
+            return cached
+        
         self.total_requests += 1
         
-        url = f"{self.base_url}/api/chat"
+        payload = self._build_chat_payload(messages, model, temperature, options)
         
-        payload = {
-            "model": model,
-            "messages": messages,
-            "stream": False
-        }
+        try:
+            response = self._post("/api/chat", payload)
+            
+            if response.status_code == 200:
+                data = response.json()
+                result = data.get("message", {}).get("content", "").strip()
+                self._cache_put(cache_prompt, model, temperature, result)
+                return result
+            else:
+                self.failed_requests += 1
+                return f"[Error: API returned status {response.status_code}]"
+                
+        except Exception as e:
+            self.failed_requests += 1
+            print(f"❌ Chat generation failed: {e}")
+            return f"[Error: {str(e)}]"
+    
+    async def achat(
+        self,
+        messages: list[Dict[str, str]],
+        model: str = "llama2",
+        temperature: float = 0.7,
+        options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Use chat endpoint without blocking the event loop.
+        
+        Shares the `max_concurrent` limit with agenerate.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            model: Model name to use
+            temperature: Sampling temperature (0.0 to 1.0)
+            options: Extra Ollama model options
+            
+        Returns:
+            Generated response
+        """
+        cache_prompt = self._chat_cache_prompt(messages)
+        cached = await self._acache_get(cache_prompt, model, temperature)
+        if cached is not None:
+            return cached
+        
+        self.total_requests += 1
+        
+        payload = self._build_chat_payload(messages, model, temperature, options)
         
         try:
-            response = requests.post(url, json=payload, timeout=self.timeout)
+            response = await self._apost("/api/chat", payload)
             
             if response.status_code == 200:
                 data = response.json()
-                return data.get("message", {}).get("content", "").strip()
+                result = data.get("message", {}).get("content", "").strip()
+                await self._acache_put(cache_prompt, model, temperature, result)
+                return result
             else:
                 self.failed_requests += 1
                 return f"[Error: API returned status {response.status_code}]"
@@ -190,9 +828,174 @@ class LLMInterface:
             print(f"❌ Chat generation failed: {e}")
             return f"[Error: {str(e)}]"
     
+    async def achat_batch(
+        self,
+        requests_in: List[Tuple[List[Dict[str, str]], str]],
+        on_complete: Optional[Callable[[int, str], None]] = None
+    ) -> List[str]:
+        """
+        Send many (messages, model) chat requests as one concurrent batch.
+        
+        Like agenerate_batch, every request is in flight at once over the
+        pooled client, bounded per endpoint by `max_concurrent`.
+        
+        Args:
+            requests_in: List of (messages, model) tuples
+            on_complete: Optional callback receiving (index, response) as each
+                request finishes, in completion order
+            
+        Returns:
+            Responses in the same order as `requests_in`
+        """
+        async def send(index: int, messages: List[Dict[str, str]], model: str) -> str:
+            response = await self.achat(messages, model)
+            if on_complete is not None:
+                on_complete(index, response)
+            return response
+        
+        return list(await asyncio.gather(*[
+            send(index, messages, model)
+            for index, (messages, model) in enumerate(requests_in)
+        ]))
+    
+    def chat_batch(
+        self,
+        requests_in: List[Tuple[List[Dict[str, str]], str]]
+    ) -> List[str]:
+        """
+        Synchronous wrapper around achat_batch.
+        
+        Must not be called from inside a running event loop.
+        
+        Args:
+            requests_in: List of (messages, model) tuples
+            
+        Returns:
+            Responses in the same order as `requests_in`
+        """
+        async def run() -> List[str]:
+            try:
+                return await self.achat_batch(requests_in)
+            finally:
+                await self.aclose()
+        
+        return asyncio.run(run())
+    
+    def _build_chat_payload(
+        self,
+        messages: list[Dict[str, str]],
+        model: str,
+        temperature: float,
+        options: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the request body for the /api/chat endpoint.
+        
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            model: Model name to use
+            temperature: Sampling temperature
+            options: Extra Ollama model options
+            
+        Returns:
+            JSON-serializable payload dictionary
+        """
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": temperature
+            }
+        }
+        
+        if options:
+            payload["options"].update(options)
+        
+        return payload
+    
+    def _cache_get(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        semantic: bool = False
+    ) -> Optional[str]:
+        """
+        Look up a response in the prompt cache, if this call may use it.
+        
+        Args:
+            prompt: Prompt text (or serialized chat messages)
+            model: Model name
+            temperature: Sampling temperature of the call
+            semantic: Allow hits from similar prompts
+            
+        Returns:
+            Cached response, or None
+        """
+        if not self._cache_allowed(temperature):
+            return None
+        return self.cache.get(prompt, model, temperature, semantic)
+    
+    def _cache_put(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        response: str,
+        semantic: bool = False
+    ) -> None:
+        """Store a response in the prompt cache, if this call may use it."""
+        if self._cache_allowed(temperature):
+            self.cache.put(prompt, model, response, temperature, semantic)
+    
+    async def _acache_get(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        semantic: bool = False
+    ) -> Optional[str]:
+        """
+        Async version of _cache_get for the event-loop paths.
+        
+        SQLite reads and prompt embedding block, so the lookup runs in a
+        worker thread instead of stalling every other in-flight request.
+        """
+        if not self._cache_allowed(temperature):
+            return None
+        return await asyncio.to_thread(self.cache.get, prompt, model, temperature, semantic)
+    
+    async def _acache_put(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        response: str,
+        semantic: bool = False
+    ) -> None:
+        """Async version of _cache_put; stores the response from a worker thread."""
+        if self._cache_allowed(temperature):
+            await asyncio.to_thread(self.cache.put, prompt, model, response, temperature, semantic)
+    
+    def _cache_allowed(self, temperature: float) -> bool:
+        """Whether a call at this temperature reads from and writes to the cache."""
+        if self.cache is None:
+            return False
+        return temperature == 0 or not self.cache_deterministic_only
+    
+    @staticmethod
+    def _chat_cache_prompt(messages: list[Dict[str, str]]) -> str:
+        """Serialize chat messages into a stable prompt-cache key."""
+        return json.dumps(messages, sort_keys=True, ensure_ascii=False)
+    
     def pull_model(self, model_name: str) -> bool:
         """
-        Pull a model from Ollama registry.
+        Pull a model from Ollama registry, reporting progress as it streams.
+        
+        The timeout applies between progress events rather than to the whole
+        download, so large models no longer fail at a fixed ceiling.
         
         Args:
             model_name: Name of the model to pull
@@ -201,12 +1004,46 @@ class LLMInterface:
             True if successful, False otherwise
         """
         url = f"{self.base_url}/api/pull"
-        payload = {"name": model_name, "stream": False}
+        payload = {"name": model_name, "stream": True}
         
         try:
             print(f"📥 Pulling model '{model_name}'... (this may take a while)")
-            response = requests.post(url, json=payload, timeout=600)
-            return response.status_code == 200
+            with self._session.post(url, json=payload, stream=True, timeout=self.timeout) as response:
+                if response.status_code != 200:
+                    print(f"❌ Failed to pull model: API returned status {response.status_code}")
+                    return False
+                
+                last_status = None
+                last_decile = -1
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    
+                    event = json.loads(line)
+                    if "error" in event:
+                        print(f"❌ Failed to pull model: {event['error']}")
+                        return False
+                    
+                    status = event.get("status", "")
+                    if status == "success":
+                        print(f"✅ Model '{model_name}' is ready")
+                        return True
+                    
+                    if status != last_status:
+                        print(f"   {status}")
+                        last_status = status
+                        last_decile = -1
+                    
+                    # Report download progress in 10% steps
+                    total = event.get("total")
+                    if total:
+                        decile = event.get("completed", 0) * 10 // total
+                        if decile > last_decile:
+                            print(f"   {decile * 10}%")
+                            last_decile = decile
+            
+            print("❌ Failed to pull model: stream ended before completion")
+            return False
         except Exception as e:
             print(f"❌ Failed to pull model: {e}")
             return False
@@ -223,32 +1060,56 @@ class LLMInterface:
             success_rate = ((self.total_requests - self.failed_requests) / 
                           self.total_requests * 100)
         
-        return {
+        stats = {
             "total_requests": self.total_requests,
             "failed_requests": self.failed_requests,
             "success_rate": f"{success_rate:.1f}%"
         }
+        
+        if self._breakers:
+            stats["circuit_breakers"] = {
+                model: breaker.state for model, breaker in self._breakers.items()
+            }
+        
+        if self.cache is not None:
+            stats["cache"] = self.cache.get_stats()
+        
+        return stats
     
     def __repr__(self) -> str:
         """String representation of the interface."""
-        return f"LLMInterface(base_url='{self.base_url}')"
+        return f"LLMInterface(endpoints={self.endpoints})"
 
 
 # Singleton instance for easy access
 _llm_interface: Optional[LLMInterface] = None
 
 
-def get_llm_interface(base_url: str = OLLAMA_BASE_URL) -> LLMInterface:
+def get_llm_interface(
+    base_url: str = OLLAMA_BASE_URL,
+    endpoints: Optional[List[str]] = None
+) -> LLMInterface:
     """
     Get or create the global LLM interface instance.
     
     Args:
         base_url: Base URL for Ollama API
+        endpoints: Ollama servers to load-balance over (defaults to OLLAMA_ENDPOINTS);
+            passing a different list replaces the global instance
         
     Returns:
         LLMInterface instance
     """
     global _llm_interface
+    if endpoints is None:
+        endpoints = OLLAMA_ENDPOINTS if base_url == OLLAMA_BASE_URL else [base_url]
+    endpoints = [url.rstrip('/') for url in endpoints]
+    
     if _llm_interface is None:
-        _llm_interface = LLMInterface(base_url)
+        cache = PromptCache() if PROMPT_CACHE_ENABLED else None
+        _llm_interface = LLMInterface(base_url, cache=cache, endpoints=endpoints)
+    elif _llm_interface.endpoints != endpoints:
+        # Keep the prompt cache; responses don't depend on which server answered
+        _llm_interface.close()
+        _llm_interface = LLMInterface(base_url, cache=_llm_interface.cache, endpoints=endpoints)
     return _llm_interface
@@ -1,15 +1,37 @@
 """
 Logger module for AI Hunger Games.
-Handles JSON and CSV export of simulation data.
+Handles JSON, JSON Lines and CSV export of simulation data.
 """
 
-import json
 import csv
+import gzip
 import os
-from typing import Dict, List, Any
+import pickle
+import queue
+import threading
+import time
+from typing import Dict, List, Any, BinaryIO, Callable, Optional
+import orjson
 from datetime import datetime
 from config import LOG_DIR, LOG_FILE, CSV_FILE
 
+# Vote tallies may be keyed by non-str values or hold NumPy scalars
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def truncate(text: str, limit: int = 100) -> str:
+    """
+    Shorten text for display, adding an ellipsis only if something was cut.
+    
+    Args:
+        text: Text to shorten
+        limit: Maximum number of characters kept
+        
+    Returns:
+        The text itself, or its first `limit` characters followed by "..."
+    """
+    return text if len(text) <= limit else text[:limit] + "..."
+
 
 class SimulationLogger:
     """
@@ -17,7 +39,11 @@ class SimulationLogger:
     
     Outputs:
     - JSON: Complete simulation history with all details
+    - JSON Lines: One record per round, appended as the simulation runs
     - CSV: Tabular data for easy analysis in spreadsheets
+    
+    Per-round file writes are handed to a background thread so disk I/O
+    stays off the simulation's critical path; flush() waits for them.
     """
     
     def __init__(self, log_dir: str = LOG_DIR):
@@ -37,6 +63,20 @@ class SimulationLogger:
             "final_stats": {}
         }
         
+        # Agent name -> position in simulation_data["agents"]
+        self._agent_index: Dict[str, int] = {}
+        
+        # Shared timestamp (ns since epoch) for every event of the current round
+        self._round_ts_ns: Optional[int] = None
+        
+        # Rounds are appended here as they happen (opened by initialize_log)
+        self._round_jsonl: Optional[BinaryIO] = None
+        self.rounds_jsonl_path: Optional[str] = None
+        
+        # Background writer for per-round appends and snapshots (started lazily)
+        self._write_queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        
         # Ensure log directory exists
         os.makedirs(self.log_dir, exist_ok=True)
     
@@ -53,6 +93,47 @@ class SimulationLogger:
             "version": "1.0.0"
         }
         self.simulation_data["config"] = config
+        
+        self.close()
+        sim_id = self.simulation_data["metadata"]["simulation_id"]
+        self.rounds_jsonl_path = os.path.join(self.log_dir, f"rounds_{sim_id}.jsonl")
+        self._round_jsonl = open(self.rounds_jsonl_path, 'ab')
+    
+    def begin_round(self, round_num: int, timestamp: Optional[float] = None) -> None:
+        """
+        Stamp the start of a round; later events in the round reuse the stamp.
+        
+        Args:
+            round_num: Round number
+            timestamp: Round start as a Unix timestamp (defaults to now)
+        """
+        self._round_ts_ns = time.time_ns() if timestamp is None else int(timestamp * 1e9)
+    
+    def _timestamp_ns(self) -> int:
+        """Current round's timestamp, or now if no round has begun."""
+        return self._round_ts_ns or time.time_ns()
+    
+    @staticmethod
+    def _export_record(record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy a record with its integer timestamp formatted as ISO-8601.
+        
+        Records keep raw `timestamp_ns` values while the simulation runs;
+        formatting is deferred to export time.
+        
+        Args:
+            record: Round or evolution record
+            
+        Returns:
+            Record with `timestamp_ns` replaced by `timestamp`
+        """
+        if "timestamp_ns" not in record:
+            return record
+        return {
+            ("timestamp" if key == "timestamp_ns" else key):
+                (datetime.fromtimestamp(value / 1e9).isoformat() if key == "timestamp_ns" else value)
+            for key, value in record.items()
+        }
     
     def log_round(
         self,
@@ -78,7 +159,7 @@ class SimulationLogger:
         """
         round_data = {
             "round_number": round_num,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp_ns": self._timestamp_ns(),
             "question": question,
             "answers": answers,
             "vote_results": vote_results,
@@ -88,7 +169,81 @@ class SimulationLogger:
             "agent_count": len(current_agents)
         }
         
+        self._append_round(round_data)
+    
+    def log_round_batch(
+        self,
+        round_num: int,
+        question: str,
+        answers: Dict[str, str],
+        vote_results: Dict[str, Any],
+        loser_name: str,
+        eliminated_agent: Optional[Dict[str, Any]],
+        new_agent: Dict[str, Any],
+        surviving_agents: List[str]
+    ) -> None:
+        """
+        Log everything a round produced in one call.
+        
+        Records the elimination and creation events, the new agent and the
+        round itself, all stamped with the round's timestamp, and queues a
+        single JSON Lines append.
+        
+        Args:
+            round_num: Round number
+            question: Question asked
+            answers: Dictionary of agent answers
+            vote_results: Voting results
+            loser_name: Name of the agent voted out
+            eliminated_agent: Dictionary of the eliminated agent (None if none was removed)
+            new_agent: Dictionary representation of new agent
+            surviving_agents: Names of the agents alive after the round
+        """
+        ts_ns = self._timestamp_ns()
+        evolution_history = self.simulation_data["evolution_history"]
+        
+        if eliminated_agent is not None:
+            evolution_history.append({
+                "type": "elimination",
+                "round": round_num,
+                "agent_name": eliminated_agent["name"],
+                "timestamp_ns": ts_ns,
+                "details": eliminated_agent
+            })
+        
+        self.log_agent(new_agent)
+        evolution_history.append({
+            "type": "creation",
+            "round": round_num,
+            "agent_name": new_agent["name"],
+            "timestamp_ns": ts_ns,
+            "details": new_agent
+        })
+        
+        self._append_round({
+            "round_number": round_num,
+            "timestamp_ns": ts_ns,
+            "question": question,
+            "answers": answers,
+            "vote_results": vote_results,
+            "eliminated_agent": loser_name,
+            "new_agent": new_agent,
+            "surviving_agents": surviving_agents,
+            "agent_count": len(surviving_agents)
+        })
+    
+    def _append_round(self, round_data: Dict[str, Any]) -> None:
+        """
+        Store a round record and queue its JSON Lines append.
+        
+        Args:
+            round_data: Round record with a raw `timestamp_ns`
+        """
         self.simulation_data["rounds"].append(round_data)
+        
+        if self._round_jsonl is not None:
+            line = orjson.dumps(self._export_record(round_data), option=_ORJSON_OPTIONS) + b"\n"
+            self._submit(self._append_round_line, self._round_jsonl, line)
     
     def log_agent(self, agent_dict: Dict[str, Any]) -> None:
         """
@@ -97,17 +252,15 @@ class SimulationLogger:
         Args:
             agent_dict: Dictionary representation of agent
         """
-        # Check if agent already logged
-        existing = [a for a in self.simulation_data["agents"] if a["name"] == agent_dict["name"]]
+        agents = self.simulation_data["agents"]
+        idx = self._agent_index.get(agent_dict["name"])
         
-        if not existing:
-            self.simulation_data["agents"].append(agent_dict)
+        if idx is None:
+            self._agent_index[agent_dict["name"]] = len(agents)
+            agents.append(agent_dict)
         else:
             # Update existing agent data
-            for i, a in enumerate(self.simulation_data["agents"]):
-                if a["name"] == agent_dict["name"]:
-                    self.simulation_data["agents"][i] = agent_dict
-                    break
+            agents[idx] = agent_dict
     
     def log_evolution_event(
         self,
@@ -129,7 +282,7 @@ class SimulationLogger:
             "type": event_type,
             "round": round_num,
             "agent_name": agent_name,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp_ns": self._timestamp_ns(),
             "details": details
         }
         
@@ -146,6 +299,56 @@ class SimulationLogger:
         self.simulation_data["metadata"]["end_time"] = datetime.now().isoformat()
         self.simulation_data["final_stats"] = stats
         self.simulation_data["final_agents"] = final_agents
+        self.close()
+    
+    def flush(self) -> None:
+        """Wait until every queued background write has finished."""
+        if self._writer is not None:
+            self._write_queue.join()
+    
+    def close(self) -> None:
+        """Finish pending writes, stop the writer thread and close the JSON Lines file."""
+        if self._writer is not None:
+            self._write_queue.put(None)
+            self._writer.join()
+            self._writer = None
+        
+        if self._round_jsonl is not None:
+            self._round_jsonl.close()
+            self._round_jsonl = None
+    
+    def _submit(self, write: Callable[..., None], *args: Any) -> None:
+        """
+        Queue a write for the background thread, starting it if needed.
+        
+        Args:
+            write: Function performing the write
+            *args: Arguments for `write`
+        """
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run_writer, name="log-writer", daemon=True)
+            self._writer.start()
+        self._write_queue.put((write, args))
+    
+    def _run_writer(self) -> None:
+        """Background loop executing queued writes in order until told to stop."""
+        while True:
+            item = self._write_queue.get()
+            try:
+                if item is None:
+                    return
+                write, args = item
+                write(*args)
+            except Exception as e:
+                print(f"⚠️  Background log write failed: {e}")
+            finally:
+                self._write_queue.task_done()
+    
+    @staticmethod
+    def _append_round_line(f: BinaryIO, line: bytes) -> None:
+        """Append one JSON Lines record and flush it to disk."""
+        f.write(line)
+        f.flush()
     
     def save_json(self, filename: str = None) -> str:
         """
@@ -163,8 +366,8 @@ class SimulationLogger:
         
         filepath = os.path.join(self.log_dir, filename)
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(self.simulation_data, f, indent=2, ensure_ascii=False)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(self.get_data(), option=_ORJSON_OPTIONS | orjson.OPT_INDENT_2))
         
         print(f"\n💾 Saved JSON log to: {filepath}")
         return filepath
@@ -185,39 +388,36 @@ class SimulationLogger:
         
         filepath = os.path.join(self.log_dir, filename)
         
-        # Prepare CSV rows
-        rows = []
-        all_fieldnames = set(["Round", "Question", "Eliminated", "New Agent", "Agent Count"])
-        
-        for round_data in self.simulation_data["rounds"]:
-            row = {
-                "Round": round_data["round_number"],
-                "Question": round_data["question"][:100] + "...",
-                "Eliminated": round_data["eliminated_agent"],
-                "New Agent": round_data["new_agent"].get("name", "N/A"),
-                "Agent Count": round_data["agent_count"]
-            }
+        rounds = self.simulation_data["rounds"]
+        
+        if rounds:
+            # First pass: collect every vote column so the header is complete
+            vote_keys = set()
+            for round_data in rounds:
+                vote_keys.update(round_data["vote_results"].get("votes", {}))
             
-            # Add vote counts if available
-            if "votes" in round_data["vote_results"]:
-                for agent, votes in round_data["vote_results"]["votes"].items():
-                    field_name = f"{agent}_votes"
-                    row[field_name] = votes
-                    all_fieldnames.add(field_name)
+            base_fields = ["Round", "Question", "Eliminated", "New Agent", "Agent Count"]
+            fieldnames = base_fields + sorted(f"{agent}_votes" for agent in vote_keys)
             
-            rows.append(row)
-        
-        if rows:
-            # Write CSV with all possible fieldnames
+            # Second pass: stream rows straight to the file
             with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                # Sort fieldnames for consistent output
-                base_fields = ["Round", "Question", "Eliminated", "New Agent", "Agent Count"]
-                vote_fields = sorted([f for f in all_fieldnames if f not in base_fields])
-                fieldnames = base_fields + vote_fields
-                
                 writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
                 writer.writeheader()
-                writer.writerows(rows)
+                
+                for round_data in rounds:
+                    row = {
+                        "Round": round_data["round_number"],
+                        "Question": truncate(round_data["question"]),
+                        "Eliminated": round_data["eliminated_agent"],
+                        "New Agent": round_data["new_agent"].get("name", "N/A"),
+                        "Agent Count": round_data["agent_count"]
+                    }
+                    
+                    # Add vote counts if available
+                    for agent, votes in round_data["vote_results"].get("votes", {}).items():
+                        row[f"{agent}_votes"] = votes
+                    
+                    writer.writerow(row)
             
             print(f"💾 Saved CSV log to: {filepath}")
         
@@ -255,6 +455,55 @@ class SimulationLogger:
         
         return filepath
     
+    def snapshot(self, state: Dict[str, Any], round_num: int) -> str:
+        """
+        Write an intra-run checkpoint as gzip-compressed pickle.
+        
+        Much cheaper than JSON for nested agent state. Each call atomically
+        replaces the simulation's previous checkpoint; JSON/CSV remain the
+        export formats for final results. The file is written by the
+        background writer, so call flush() before reading it back.
+        
+        Args:
+            state: Objects to checkpoint (e.g. agents and their stats pool)
+            round_num: Round the checkpoint was taken after
+            
+        Returns:
+            Path to the checkpoint file
+        """
+        sim_id = self.simulation_data["metadata"].get("simulation_id", "unknown")
+        filepath = os.path.join(self.log_dir, f"snapshot_{sim_id}.pkl.gz")
+        
+        # Pickle now, while the state is consistent; compress and write in the background
+        data = pickle.dumps({"round": round_num, **state}, protocol=5)
+        self._submit(self._write_snapshot, filepath, data)
+        
+        return filepath
+    
+    @staticmethod
+    def _write_snapshot(filepath: str, data: bytes) -> None:
+        """Compress a pickled snapshot and atomically replace the checkpoint file."""
+        tmp_path = filepath + ".tmp"
+        with gzip.open(tmp_path, 'wb', compresslevel=1) as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    
+    @staticmethod
+    def load_snapshot(filepath: str) -> Dict[str, Any]:
+        """
+        Load a checkpoint written by snapshot().
+        
+        Only load files this program wrote: unpickling runs arbitrary code.
+        
+        Args:
+            filepath: Path to the checkpoint file
+            
+        Returns:
+            The checkpointed state, including its "round"
+        """
+        with gzip.open(filepath, 'rb') as f:
+            return pickle.load(f)
+    
     def save_all(self) -> Dict[str, str]:
         """
         Save all log formats.
@@ -262,11 +511,16 @@ class SimulationLogger:
         Returns:
             Dictionary with paths to all saved files
         """
-        return {
+        self.flush()
+        
+        saved_files = {
             "json": self.save_json(),
             "csv": self.save_csv(),
             "agents_csv": self.save_agents_csv()
         }
+        if self.rounds_jsonl_path:
+            saved_files["rounds_jsonl"] = self.rounds_jsonl_path
+        return saved_files
     
     def print_summary(self) -> None:
         """Print a summary of logged data."""
@@ -295,12 +549,18 @@ class SimulationLogger:
     
     def get_data(self) -> Dict[str, Any]:
         """
-        Get the complete simulation data.
+        Get the complete simulation data, with timestamps formatted.
         
         Returns:
             Complete simulation data dictionary
         """
-        return self.simulation_data
+        return {
+            **self.simulation_data,
+            "rounds": [self._export_record(r) for r in self.simulation_data["rounds"]],
+            "evolution_history": [
+                self._export_record(e) for e in self.simulation_data["evolution_history"]
+            ]
+        }
     
     def load_from_file(self, filepath: str) -> None:
         """
@@ -309,8 +569,12 @@ class SimulationLogger:
         Args:
             filepath: Path to JSON file
         """
-        with open(filepath, 'r', encoding='utf-8') as f:
-            self.simulation_data = json.load(f)
+        with open(filepath, 'rb') as f:
+            self.simulation_data = orjson.loads(f.read())
+        
+        self._agent_index = {
+            agent["name"]: i for i, agent in enumerate(self.simulation_data.get("agents", []))
+        }
         
         print(f"📂 Loaded simulation data from: {filepath}")
 
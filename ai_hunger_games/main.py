@@ -56,6 +56,13 @@ Examples:
         help=f'Voting method (default: {VOTING_METHOD})'
     )
     
+    parser.add_argument(
+        '--endpoints',
+        type=lambda value: [url.strip() for url in value.split(',') if url.strip()],
+        help='Comma-separated Ollama URLs to load-balance over '
+             '(e.g. http://h1:11434,http://h2:11434)'
+    )
+    
     parser.add_argument(
         '--questions',
         nargs='+',
@@ -110,6 +117,8 @@ def main():
     print(f"   Rounds: {args.rounds}")
     print(f"   Model: {args.model}")
     print(f"   Voting: {args.voting}")
+    if args.endpoints:
+        print(f"   Endpoints: {', '.join(args.endpoints)}")
     print(f"   Verbose: {not args.quiet}")
     print()
     
@@ -143,7 +152,8 @@ def main():
             num_rounds=args.rounds,
             model=args.model,
             voting_method=args.voting,
-            verbose=not args.quiet
+            verbose=not args.quiet,
+            endpoints=args.endpoints
         )
         
         # Load personalities if custom file provided
@@ -0,0 +1,105 @@
+"""
+Resilience helpers for AI Hunger Games.
+Backoff delays and a per-model circuit breaker for calls to Ollama.
+"""
+
+import random
+import time
+from config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT
+
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the model's circuit is open."""
+
+
+def backoff_delay(attempt: int, base: float, max_delay: float = 30.0) -> float:
+    """
+    Exponential backoff delay with ±25% jitter.
+
+    Args:
+        attempt: Zero-based attempt number that just failed
+        base: Delay after the first failure in seconds
+        max_delay: Upper bound on the delay in seconds
+
+    Returns:
+        Seconds to wait before the next attempt
+    """
+    delay = base * (2 ** attempt) * random.uniform(0.75, 1.25)
+    return min(delay, max_delay)
+
+
+class CircuitBreaker:
+    """
+    Stops calling a failing model until it has had time to recover.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls are refused. Once `reset_timeout` seconds have passed it becomes
+    half-open: exactly one trial call is let through and the rest are still
+    refused, and the trial's outcome closes the circuit again or re-opens it.
+    A trial that never reports back frees its slot after another `reset_timeout`.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT
+    ):
+        """
+        Initialize a closed circuit.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds to wait before letting a trial call through
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float = 0.0
+        self.half_open_in_flight = False
+        self.trial_started_at: float = 0.0
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half-open"."""
+        if self.failures < self.failure_threshold:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may be made now, claiming the trial slot when half-open.
+
+        Returns:
+            True when closed, or for the single trial call when half-open;
+            False otherwise
+        """
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open":
+            return False
+
+        now = time.monotonic()
+        if self.half_open_in_flight and now - self.trial_started_at < self.reset_timeout:
+            return False
+        self.half_open_in_flight = True
+        self.trial_started_at = now
+        return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        self.failures = 0
+        self.half_open_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening (or re-opening) the circuit at the threshold."""
+        self.failures += 1
+        self.half_open_in_flight = False
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
@@ -3,21 +3,53 @@ Simulation engine for AI Hunger Games.
 Orchestrates rounds, manages agents, and coordinates all components.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+import asyncio
+import functools
+from itertools import cycle, islice
 import json
+import operator
 import os
+import time
 from agent import Agent
+from agent_pool import AgentPool, scatter_add_agents
 from llm_interface import LLMInterface, get_llm_interface
 from voting import VotingSystem
 from evolution import EvolutionManager
-from logger import SimulationLogger, create_logger
+from logger import SimulationLogger, create_logger, truncate
 from config import (
     NUM_AGENTS, NUM_ROUNDS, OLLAMA_MODEL, VOTING_METHOD,
-    ALLOW_SELF_VOTING, MUTATION_RATE, MUTATION_TRAITS, VERBOSE,
+    ALLOW_SELF_VOTING, MUTATION_RATE, MUTATION_TRAITS, VERBOSE, SNAPSHOT_ROUNDS, WARMUP_MODEL,
     get_config, DEFAULT_QUESTIONS
 )
 
 
+# Bundled personalities, resolved next to this module rather than the CWD
+DEFAULT_PERSONALITIES_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "prompts", "base_personalities.json"
+)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_personalities_cached(path: str, mtime_ns: int) -> tuple:
+    """
+    Parse a personalities file.
+    
+    Cached on the file's mtime, so an unchanged file is parsed only once
+    while edits on disk are still picked up.
+    
+    Args:
+        path: Path to personalities JSON file
+        mtime_ns: File modification time (cache key only)
+        
+    Returns:
+        Tuple of personality dictionaries
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return tuple(data.get("personalities", []))
+
+
 class HungerGamesSimulation:
     """
     Main simulation engine for AI Hunger Games.
@@ -35,7 +67,8 @@ class HungerGamesSimulation:
         num_rounds: int = NUM_ROUNDS,
         model: str = OLLAMA_MODEL,
         voting_method: str = VOTING_METHOD,
-        verbose: bool = VERBOSE
+        verbose: bool = VERBOSE,
+        endpoints: Optional[List[str]] = None
     ):
         """
         Initialize the simulation.
@@ -46,6 +79,7 @@ class HungerGamesSimulation:
             model: Default Ollama model
             voting_method: Voting method to use
             verbose: Whether to print detailed output
+            endpoints: Ollama servers to spread requests over (defaults to OLLAMA_ENDPOINTS)
         """
         self.num_agents = num_agents
         self.num_rounds = num_rounds
@@ -53,18 +87,20 @@ class HungerGamesSimulation:
         self.verbose = verbose
         
         # Initialize components
-        self.llm = get_llm_interface()
+        self.llm = get_llm_interface(endpoints=endpoints)
         self.voting_system = VotingSystem(voting_method, ALLOW_SELF_VOTING)
         self.evolution_manager = EvolutionManager(MUTATION_RATE, MUTATION_TRAITS)
         self.logger = create_logger()
         
         # Simulation state
+        self.pool = AgentPool(capacity=num_agents + num_rounds)
         self.agents: List[Agent] = []
         self.current_round: int = 0
         self.all_agents_history: List[Agent] = []
         
-        # Initialize logger
-        self.logger.initialize_log(get_config())
+        # Initialize logger with this simulation's own configuration snapshot
+        self.config = get_config()
+        self.logger.initialize_log(self.config)
     
     def load_initial_personalities(self, personalities_file: str = None) -> List[Dict[str, str]]:
         """
@@ -77,17 +113,19 @@ class HungerGamesSimulation:
             List of personality dictionaries
         """
         if personalities_file is None:
-            personalities_file = os.path.join("prompts", "base_personalities.json")
+            personalities_file = DEFAULT_PERSONALITIES_FILE
         
-        if not os.path.exists(personalities_file):
+        try:
+            mtime_ns = os.stat(personalities_file).st_mtime_ns
+        except OSError:
             print(f"⚠️  Personalities file not found: {personalities_file}")
             print("    Using default personalities...")
             return self._get_default_personalities()
         
         try:
-            with open(personalities_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get("personalities", [])
+            # Copy each entry so callers can't mutate the cached parse
+            cached = _load_personalities_cached(os.path.abspath(personalities_file), mtime_ns)
+            return [dict(personality) for personality in cached]
         except Exception as e:
             print(f"❌ Error loading personalities: {e}")
             return self._get_default_personalities()
@@ -118,9 +156,8 @@ class HungerGamesSimulation:
         # Ensure we have enough personalities
         if len(personalities) < self.num_agents:
             print(f"⚠️  Only {len(personalities)} personalities available, need {self.num_agents}")
-            # Duplicate some personalities if needed
-            while len(personalities) < self.num_agents:
-                personalities.append(personalities[len(personalities) % len(personalities)])
+            # Reuse personalities in order until there are enough
+            personalities = list(islice(cycle(personalities), self.num_agents))
         
         print(f"\n🎮 Initializing {self.num_agents} agents...")
         
@@ -131,7 +168,8 @@ class HungerGamesSimulation:
                 personality_prompt=personality["personality"],
                 model=self.model,
                 generation=0,
-                birth_round=0
+                birth_round=0,
+                pool=self.pool
             )
             self.agents.append(agent)
             self.all_agents_history.append(agent)
@@ -146,6 +184,19 @@ class HungerGamesSimulation:
         """
         Run a single round of the simulation.
         
+        Args:
+            round_num: Current round number
+            question: Question to ask agents
+            
+        Returns:
+            Dictionary with round results
+        """
+        return asyncio.run(self.arun_round(round_num, question))
+    
+    async def arun_round(self, round_num: int, question: str) -> Dict[str, Any]:
+        """
+        Run a single round, querying all agents concurrently in each phase.
+        
         Args:
             round_num: Current round number
             question: Question to ask agents
@@ -158,25 +209,18 @@ class HungerGamesSimulation:
         print(f"{'='*60}")
         print(f"\n📝 Question: {question}\n")
         
+        # One timestamp for every memory and log event of this round
+        round_ts = time.time()
+        self.logger.begin_round(round_num, round_ts)
+        
         # Update rounds survived for current agents
-        for agent in self.agents:
-            agent.rounds_survived += 1
+        scatter_add_agents(self.agents, "rounds_survived")
         
         # Phase 1: Collect answers
-        answers = {}
-        print("💬 Collecting answers...")
-        for agent in self.agents:
-            if self.verbose:
-                print(f"  Asking {agent.name}...")
-            
-            answer = agent.generate_answer(question, round_num, self.llm)
-            answers[agent.name] = answer
-            
-            if self.verbose:
-                print(f"  ✓ {agent.name}: {answer[:100]}{'...' if len(answer) > 100 else ''}\n")
+        answers = await self._collect_answers(question, round_num, round_ts)
         
         # Phase 2: Voting
-        vote_results = self.voting_system.conduct_vote(
+        vote_results = await self.voting_system.aconduct_vote(
             self.agents,
             question,
             answers,
@@ -196,49 +240,45 @@ class HungerGamesSimulation:
             round_num
         )
         
-        if eliminated_agent:
-            self.logger.log_evolution_event(
-                "elimination",
-                round_num,
-                eliminated_agent.name,
-                eliminated_agent.to_dict()
-            )
-        
         # Phase 4: Evolution
         new_agent = self.evolution_manager.create_evolved_agent(
             self.agents,
             round_num,
-            self.model
+            self.model,
+            pool=self.pool
         )
         
         self.agents.append(new_agent)
         self.all_agents_history.append(new_agent)
-        self.logger.log_agent(new_agent.to_dict())
-        self.logger.log_evolution_event(
-            "creation",
-            round_num,
-            new_agent.name,
-            new_agent.to_dict()
-        )
         
-        # Log round data
-        self.logger.log_round(
+        # Log the whole round in one call
+        self.logger.log_round_batch(
             round_num,
             question,
             answers,
             vote_results,
             loser_name,
+            eliminated_agent.to_dict() if eliminated_agent else None,
             new_agent.to_dict(),
-            [agent.to_dict() for agent in self.agents]
+            [agent.name for agent in self.agents]
         )
         
+        if SNAPSHOT_ROUNDS:
+            # Pickling a large population can take a while; keep the loop responsive
+            await asyncio.to_thread(
+                self.logger.snapshot,
+                {"agents": self.agents, "all_agents_history": self.all_agents_history},
+                round_num
+            )
+        
         # Print current population
-        print(f"\n👥 Current Population ({len(self.agents)} agents):")
+        lines = [f"\n👥 Current Population ({len(self.agents)} agents):"]
         for agent in self.agents:
             gen_info = f"Gen {agent.generation}"
             if agent.parent_name:
                 gen_info += f" (from {agent.parent_name})"
-            print(f"  • {agent.name:25} | {gen_info}")
+            lines.append(f"  • {agent.name:25} | {gen_info}")
+        print("\n".join(lines))
         
         return {
             "round": round_num,
@@ -249,6 +289,47 @@ class HungerGamesSimulation:
             "evolved": new_agent.name
         }
     
+    async def _collect_answers(
+        self,
+        question: str,
+        round_num: int,
+        round_ts: Optional[float] = None
+    ) -> Dict[str, str]:
+        """
+        Ask every agent the question concurrently and record their answers.
+        
+        Args:
+            question: Question to ask agents
+            round_num: Current round number
+            round_ts: Timestamp shared by this round's memories
+            
+        Returns:
+            Dictionary mapping agent names to answers
+        """
+        print("💬 Collecting answers...")
+        if self.verbose:
+            print(f"  Asking {len(self.agents)} agents...")
+        
+        # One batch so every prompt is in flight at once (bounded by OLLAMA_NUM_PARALLEL)
+        agent_answers = await self.llm.agenerate_batch(
+            [(agent.build_answer_prompt(question), agent.model) for agent in self.agents],
+            [agent.prompt_options for agent in self.agents],
+            semantic=True
+        )
+        
+        answers = {}
+        for agent, answer in zip(self.agents, agent_answers):
+            agent.record_answer(question, answer, round_num, round_ts)
+            answers[agent.name] = answer
+        
+        if self.verbose:
+            # One write for the whole round instead of one per agent
+            print("".join(
+                f"  ✓ {name}: {truncate(answer)}\n\n" for name, answer in answers.items()
+            ), end="")
+        
+        return answers
+    
     def run_simulation(self, questions: List[str] = None) -> Dict[str, Any]:
         """
         Run the complete simulation.
@@ -259,16 +340,37 @@ class HungerGamesSimulation:
         Returns:
             Final simulation results
         """
-        # Check Ollama connection
+        return asyncio.run(self.arun_simulation(questions))
+    
+    async def arun_simulation(
+        self,
+        questions: List[str] = None,
+        on_round_complete: Optional[Callable[[int, Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the complete simulation from within an event loop.
+        
+        Args:
+            questions: List of questions to ask (uses defaults if None)
+            on_round_complete: Optional coroutine called with (round_num, round_results)
+                after each round, e.g. to publish progress
+            
+        Returns:
+            Final simulation results
+        """
+        # Check Ollama connection; these are blocking HTTP calls, so run them
+        # off the event loop (it may be serving other requests)
         print("🔌 Checking Ollama connection...")
-        if not self.llm.check_connection():
+        if not await asyncio.to_thread(self.llm.check_connection):
             print("\n❌ Cannot connect to Ollama!")
             print("   Make sure Ollama is running: ollama serve")
             print(f"   Make sure you have a model: ollama pull {self.model}")
+            await asyncio.to_thread(self.close)
             return {}
         
         print(f"✅ Connected to Ollama")
-        print(f"📋 Available models: {', '.join(self.llm.list_models())}\n")
+        models = await asyncio.to_thread(self.llm.list_models)
+        print(f"📋 Available models: {', '.join(models)}\n")
         
         # Use default questions if none provided
         if questions is None:
@@ -277,9 +379,8 @@ class HungerGamesSimulation:
         # Ensure we have enough questions
         if len(questions) < self.num_rounds:
             print(f"⚠️  Only {len(questions)} questions provided, need {self.num_rounds}")
-            # Repeat questions if needed
-            while len(questions) < self.num_rounds:
-                questions.append(questions[len(questions) % len(questions)])
+            # Repeat questions in order until there are enough
+            questions = list(islice(cycle(questions), self.num_rounds))
         
         # Initialize agents
         self.initialize_agents()
@@ -287,13 +388,42 @@ class HungerGamesSimulation:
         # Run rounds
         print(f"\n🎬 Starting simulation: {self.num_rounds} rounds\n")
         
-        for round_num in range(1, self.num_rounds + 1):
-            question = questions[round_num - 1]
-            self.run_round(round_num, question)
-            self.current_round = round_num
+        try:
+            if WARMUP_MODEL:
+                await self.warm_up()
+            
+            for round_num in range(1, self.num_rounds + 1):
+                question = questions[round_num - 1]
+                round_results = await self.arun_round(round_num, question)
+                self.current_round = round_num
+                
+                if on_round_complete is not None:
+                    await on_round_complete(round_num, round_results)
+        finally:
+            await self.llm.aclose()
+            # Also reached when the run is cancelled or fails, where finalize() never runs
+            await asyncio.to_thread(self.close)
+        
+        # Finalize (saves files and waits on the log writer)
+        return await asyncio.to_thread(self.finalize)
+    
+    async def warm_up(self) -> None:
+        """
+        Load the model and prefill every agent's prompt prefix before round 1.
         
-        # Finalize
-        return self.finalize()
+        Without this, the first round pays the model load and a cold prefill
+        for each agent. Only the static prefixes are warmed: the voting prompt
+        is built from the round's answers and can't be prefilled in advance.
+        """
+        print(f"🔥 Warming up {self.model}...")
+        start = time.perf_counter()
+        warmed = await self.llm.awarm(
+            [agent.system_prefix for agent in self.agents],
+            self.model,
+            [agent.prompt_options for agent in self.agents]
+        )
+        elapsed = time.perf_counter() - start
+        print(f"✅ Warmed {warmed}/{len(self.agents)} agent prompts in {elapsed:.1f}s\n")
     
     def finalize(self) -> Dict[str, Any]:
         """
@@ -312,12 +442,13 @@ class HungerGamesSimulation:
             "total_agents_created": len(self.all_agents_history),
             "surviving_agents": len(self.agents),
             "llm_stats": self.llm.get_stats(),
-            "generation_stats": self.evolution_manager.get_generation_stats(self.agents)
+            "generation_stats": self.evolution_manager.get_generation_stats(self.agents),
+            "evolution": self.evolution_manager.get_history()
         }
         
         # Print final survivors
         print("🏆 FINAL SURVIVORS:\n")
-        for i, agent in enumerate(sorted(self.agents, key=lambda a: a.votes_received, reverse=True), 1):
+        for i, agent in enumerate(sorted(self.agents, key=operator.attrgetter("votes_received"), reverse=True), 1):
             print(f"  {i}. {agent.name}")
             print(f"     Generation: {agent.generation}")
             print(f"     Rounds Survived: {agent.rounds_survived}")
@@ -326,6 +457,13 @@ class HungerGamesSimulation:
                 print(f"     Parent: {agent.parent_name}")
             print()
         
+        cache_stats = final_stats["llm_stats"].get("cache")
+        if cache_stats:
+            print(
+                f"🗄️  Prompt cache: {cache_stats['memory_hits'] + cache_stats['hits']} exact hits, "
+                f"{cache_stats['semantic_hits']} semantic hits, {cache_stats['misses']} misses\n"
+            )
+        
         # Print evolution summary
         if self.verbose:
             print(self.evolution_manager.get_evolution_summary())
@@ -349,6 +487,16 @@ class HungerGamesSimulation:
             "saved_files": saved_files
         }
     
+    def close(self) -> None:
+        """
+        Release the logger's writer thread and round file and the prompt cache connection.
+        
+        Safe to call more than once; finalize() works after it.
+        """
+        self.logger.close()
+        if self.llm.cache is not None:
+            self.llm.cache.close()
+    
     def get_simulation_data(self) -> Dict[str, Any]:
         """Get complete simulation data."""
         return self.logger.get_data()
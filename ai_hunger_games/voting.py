@@ -3,12 +3,114 @@ Voting system for AI Hunger Games.
 Implements single-choice and ranked-choice voting mechanisms.
 """
 
-from typing import Dict, List, Tuple, Any
+import asyncio
+import re
+import orjson
+from typing import Dict, List, Optional, Tuple, Any
 from collections import Counter, defaultdict
-from agent import Agent
+from operator import itemgetter
+from agent import Agent, build_vote_system_message
+from agent_pool import scatter_add_agents
 from llm_interface import LLMInterface
 
 
+# One ranked item per line: "1. Name", "2) Name" or "- Name"
+_RANK_RE = re.compile(r'^[ \t]*(?:\d+[.)]|-)[ \t]*(?P<item>.+?)[ \t]*$', re.MULTILINE)
+# "Justification: ..." line (any casing); the text after the colon is optional,
+# and a bare heading takes its text from the next non-blank line instead
+_JUST_RE = re.compile(
+    r'^[ \t]*justification[^:\n]*(?::[ \t]*(?P<text>.*?))?[ \t]*$'
+    r'(?:\s*^[ \t]*(?P<next>\S.*?)[ \t]*$)?',
+    re.MULTILINE | re.IGNORECASE
+)
+# Decoration models put around names: brackets, bold markers, quotes, "Agent " prefix
+_NAME_DECORATION_RE = re.compile(r'^[\s*"\'\[]*(?:Agent\s+)?|[\s*"\'\].]*$', re.IGNORECASE)
+
+# Longest tally bar drawn in the vote summary
+_MAX_BAR_LENGTH = 40
+
+# Vote result fields kept in vote_history; per-voter details are left to the round log
+_SUMMARY_FIELDS = ("method", "round", "question", "votes", "points", "standings", "total_votes")
+
+
+def _ranking_prefix(question: str, answers: Dict[str, str]) -> str:
+    """
+    Build the part of the ranking prompt that is the same for every voter.
+
+    Args:
+        question: The question being voted on
+        answers: All answers this round
+
+    Returns:
+        Prompt text without the voter's identity line
+    """
+    answers_text = "\n\n".join(f"Agent {name}:\n{answer}" for name, answer in answers.items())
+
+    return f"""Rank ALL of the following answers from BEST to WORST.
+
+Question: {question}
+
+Answers:
+{answers_text}
+
+Respond with JSON: the agent names from best to worst, then a brief justification.
+
+Format:
+{{"ranking": ["Agent Name", "Agent Name", ...], "justification": "Your reasoning"}}"""
+
+
+def _ranking_schema(candidates: List[str]) -> Dict[str, Any]:
+    """
+    JSON schema for a ranking response, passed to the model as its output format.
+
+    Args:
+        candidates: Names the voter may rank
+
+    Returns:
+        Schema requiring every candidate name in the ranking and a justification
+    """
+    return {
+        "type": "object",
+        "properties": {
+            "ranking": {
+                "type": "array",
+                "items": {"enum": candidates},
+                "minItems": len(candidates),
+                "maxItems": len(candidates)
+            },
+            "justification": {"type": "string"}
+        },
+        "required": ["ranking", "justification"]
+    }
+
+
+def _ranking_complete(response: str) -> bool:
+    """
+    Check whether a partial ranking response already holds everything the parser reads.
+
+    A JSON response is complete once its object closes; a free-text one once
+    a justification line with text on it has ended (a bare "Justification:"
+    heading is followed by the text on the next line, so keep reading).
+
+    Args:
+        response: Text received so far
+
+    Returns:
+        True if the rest of the generation can be skipped
+    """
+    if response.lstrip().startswith("{"):
+        try:
+            orjson.loads(response)
+        except orjson.JSONDecodeError:
+            return False
+        return True
+    for just_match in _JUST_RE.finditer(response):
+        group = "text" if just_match.group("text") else "next"
+        if just_match.group(group) and "\n" in response[just_match.end(group):]:
+            return True
+    return False
+
+
 class VotingSystem:
     """
     Manages the voting process for agent answers.
@@ -18,16 +120,24 @@ class VotingSystem:
     - Ranked-choice: Agents rank answers by preference
     """
     
-    def __init__(self, method: str = "single-choice", allow_self_voting: bool = False):
+    def __init__(
+        self,
+        method: str = "single-choice",
+        allow_self_voting: bool = False,
+        keep_details: bool = False
+    ):
         """
         Initialize the voting system.
         
         Args:
             method: Voting method ("single-choice" or "ranked-choice")
             allow_self_voting: Whether agents can vote for themselves
+            keep_details: Keep per-voter details and justifications in vote_history
+                (otherwise only tallies are kept; the returned results are complete either way)
         """
         self.method = method
         self.allow_self_voting = allow_self_voting
+        self.keep_details = keep_details
         self.vote_history: List[Dict[str, Any]] = []
     
     def conduct_vote(
@@ -41,6 +151,40 @@ class VotingSystem:
         """
         Conduct a voting round among agents.
         
+        Synchronous wrapper around aconduct_vote; must not be called from
+        inside a running event loop.
+        
+        Args:
+            agents: List of participating agents
+            question: The question that was asked
+            answers: Dictionary mapping agent names to their answers
+            round_num: Current round number
+            llm_interface: LLM interface for generating votes
+            
+        Returns:
+            Dictionary containing vote results and details
+        """
+        async def run() -> Dict[str, Any]:
+            try:
+                return await self.aconduct_vote(
+                    agents, question, answers, round_num, llm_interface
+                )
+            finally:
+                await llm_interface.aclose()
+        
+        return asyncio.run(run())
+    
+    async def aconduct_vote(
+        self,
+        agents: List[Agent],
+        question: str,
+        answers: Dict[str, str],
+        round_num: int,
+        llm_interface: LLMInterface
+    ) -> Dict[str, Any]:
+        """
+        Conduct a voting round with all agents voting concurrently.
+        
         Args:
             agents: List of participating agents
             question: The question that was asked
@@ -52,17 +196,17 @@ class VotingSystem:
             Dictionary containing vote results and details
         """
         if self.method == "single-choice":
-            return self._single_choice_vote(
+            return await self._single_choice_vote(
                 agents, question, answers, round_num, llm_interface
             )
         elif self.method == "ranked-choice":
-            return self._ranked_choice_vote(
+            return await self._ranked_choice_vote(
                 agents, question, answers, round_num, llm_interface
             )
         else:
             raise ValueError(f"Unknown voting method: {self.method}")
     
-    def _single_choice_vote(
+    async def _single_choice_vote(
         self,
         agents: List[Agent],
         question: str,
@@ -73,6 +217,11 @@ class VotingSystem:
         """
         Conduct single-choice voting where each agent votes for one answer.
         
+        Every agent's vote request is sent to the LLM as one batch, and each
+        vote is recorded and printed as soon as its response arrives. A voter
+        whose response can't be turned into a vote is left out of the tally
+        instead of failing the whole round.
+        
         Args:
             agents: List of participating agents
             question: The question that was asked
@@ -83,51 +232,105 @@ class VotingSystem:
         Returns:
             Dictionary with vote tallies and justifications
         """
-        votes: Dict[str, int] = defaultdict(int)
-        vote_details: List[Dict[str, str]] = []
-        justifications: Dict[str, List[str]] = defaultdict(list)
-        
         print(f"\n🗳️  Voting in progress...")
         
-        for agent in agents:
-            # Each agent votes
-            voted_for, justification = agent.vote_on_answers(
-                question,
-                answers,
-                round_num,
-                llm_interface,
-                self.allow_self_voting
+        ballots: List[Optional[Tuple[str, str]]] = [None] * len(agents)
+        
+        def record(position: int, response: Optional[str]) -> None:
+            agent = agents[position]
+            try:
+                ballots[position] = agent.record_vote(
+                    response, answers, round_num, self.allow_self_voting
+                )
+            except Exception as e:
+                print(f"  ⚠️  {agent.name} could not vote: {e}")
+                return
+            print(f"  ✓ {agent.name} voted for {ballots[position][0]}")
+        
+        # Agents with no one to vote for need no LLM call; the rest share one
+        # system message, built once for the round
+        system_msg = build_vote_system_message(question, answers)
+        pending: List[int] = []
+        vote_requests = []
+        for position, agent in enumerate(agents):
+            messages = agent.build_vote_request(
+                question, answers, self.allow_self_voting, system_msg
             )
+            if messages is None:
+                record(position, None)
+            else:
+                pending.append(position)
+                vote_requests.append((messages, agent.model))
+        
+        await llm_interface.achat_batch(
+            vote_requests,
+            on_complete=lambda index, response: record(pending[index], response)
+        )
+        
+        return self._tally_single_choice(agents, question, round_num, ballots)
+    
+    def _tally_single_choice(
+        self,
+        agents: List[Agent],
+        question: str,
+        round_num: int,
+        ballots: List[Optional[Tuple[str, str]]]
+    ) -> Dict[str, Any]:
+        """
+        Tally single-choice ballots and update agent vote counts.
+        
+        Args:
+            agents: List of participating agents, in ballot order
+            question: The question that was asked
+            round_num: Current round number
+            ballots: (voted_for, justification) tuples, one per agent
+                (None for an agent that could not vote)
             
+        Returns:
+            Dictionary with vote tallies and justifications
+        """
+        votes: Counter = Counter()
+        vote_details: List[Dict[str, str]] = []
+        justifications: Dict[str, List[str]] = defaultdict(list)
+        
+        # Vote recipients are collected in the same pass and credited below
+        # with one vectorized scatter-add over the stats pool
+        agent_by_name = {agent.name: agent for agent in agents}
+        recipients: List[Agent] = []
+        
+        for agent, ballot in zip(agents, ballots):
+            if ballot is None:
+                continue
+            voted_for, justification = ballot
             votes[voted_for] += 1
+            target = agent_by_name.get(voted_for)
+            if target is not None:
+                recipients.append(target)
             vote_details.append({
                 "voter": agent.name,
                 "voted_for": voted_for,
                 "justification": justification
             })
             justifications[voted_for].append(f"{agent.name}: {justification}")
-            
-            print(f"  ✓ {agent.name} voted for {voted_for}")
         
-        # Update agent vote counts
-        for agent in agents:
-            if agent.name in votes:
-                agent.votes_received += votes[agent.name]
+        scatter_add_agents(recipients, "votes_received")
         
         result = {
             "method": "single-choice",
             "round": round_num,
             "question": question,
             "votes": dict(votes),
+            # Sorted once here so winner, loser and summary never re-sort
+            "standings": votes.most_common(),
             "vote_details": vote_details,
             "justifications": dict(justifications),
-            "total_votes": len(agents)
+            "total_votes": len(vote_details)
         }
         
-        self.vote_history.append(result)
+        self._record_history(result)
         return result
     
-    def _ranked_choice_vote(
+    async def _ranked_choice_vote(
         self,
         agents: List[Agent],
         question: str,
@@ -138,7 +341,8 @@ class VotingSystem:
         """
         Conduct ranked-choice voting where agents rank all answers.
         
-        Uses instant-runoff method for determining winner.
+        Uses instant-runoff method for determining winner. Every agent's
+        ballot is requested concurrently.
         
         Args:
             agents: List of participating agents
@@ -155,53 +359,91 @@ class VotingSystem:
         
         print(f"\n🗳️  Ranked voting in progress...")
         
-        for agent in agents:
-            # Get ranked preferences from agent
-            ranked_list, justification = self._get_agent_rankings(
+        # Get ranked preferences from every agent at once; identical prompts
+        # (same model, same name) share one in-flight request
+        in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # The prompt body is identical for every voter, so build it once
+        ranking_prefix = _ranking_prefix(question, answers)
+        
+        async def collect(agent: Agent) -> Tuple[List[str], str]:
+            ballot = await self._aget_agent_rankings(
                 agent,
                 question,
                 answers,
                 round_num,
-                llm_interface
+                llm_interface,
+                in_flight,
+                ranking_prefix
             )
-            
+            # Report each ballot as soon as it is in
+            print(f"  ✓ {agent.name} submitted rankings")
+            return ballot
+        
+        ballots = await asyncio.gather(*[collect(agent) for agent in agents])
+        
+        for agent, (ranked_list, justification) in zip(agents, ballots):
             rankings.append(ranked_list)
             vote_details.append({
                 "voter": agent.name,
                 "rankings": ranked_list,
                 "justification": justification
             })
-            
-            print(f"  ✓ {agent.name} submitted rankings")
         
         # Calculate ranked-choice results
-        points = defaultdict(float)
-        num_candidates = len(answers)
+        candidates = list(answers)
+        num_candidates = len(candidates)
+        candidate_ids = {name: i for i, name in enumerate(candidates)}
+        rankings = [[name for name in ranking if name in candidate_ids] for ranking in rankings]
         
-        # Award points: 1st place gets n points, 2nd gets n-1, etc.
+        # Award points: 1st place gets n points, 2nd gets n-1, etc., into a
+        # flat list indexed by candidate id
+        scores = [0.0] * num_candidates
         for ranking in rankings:
-            for idx, agent_name in enumerate(ranking):
-                points[agent_name] += (num_candidates - idx)
+            for idx, name in enumerate(ranking):
+                scores[candidate_ids[name]] += num_candidates - idx
+        
+        # Only candidates someone ranked appear, as before
+        points = {
+            name: score for name, score in zip(candidates, scores) if score
+        }
         
         result = {
             "method": "ranked-choice",
             "round": round_num,
             "question": question,
             "points": dict(points),
+            "standings": sorted(points.items(), key=itemgetter(1), reverse=True),
             "vote_details": vote_details,
             "total_votes": len(agents)
         }
         
-        self.vote_history.append(result)
+        self._record_history(result)
         return result
     
-    def _get_agent_rankings(
+    def _record_history(self, result: Dict[str, Any]) -> None:
+        """
+        Append a vote result to vote_history, trimmed to its tallies unless
+        keep_details is set.
+        
+        Args:
+            result: Complete vote result
+        """
+        if self.keep_details:
+            self.vote_history.append(result)
+        else:
+            self.vote_history.append({
+                field: result[field] for field in _SUMMARY_FIELDS if field in result
+            })
+    
+    async def _aget_agent_rankings(
         self,
         agent: Agent,
         question: str,
         answers: Dict[str, str],
         round_num: int,
-        llm_interface: LLMInterface
+        llm_interface: LLMInterface,
+        in_flight: Optional[Dict[Tuple[str, str], asyncio.Future]] = None,
+        ranking_prefix: Optional[str] = None
     ) -> Tuple[List[str], str]:
         """
         Get ranked preferences from a single agent.
@@ -212,6 +454,10 @@ class VotingSystem:
             answers: All answers to rank
             round_num: Current round number
             llm_interface: LLM interface
+            in_flight: Requests already sent this round, keyed by (model, prompt);
+                a matching prompt awaits the existing request instead of sending another
+            ranking_prefix: Prompt body shared by every voter this round
+                (built from question and answers when omitted)
             
         Returns:
             Tuple of (ranked list of agent names, justification)
@@ -223,54 +469,73 @@ class VotingSystem:
         if not available_answers:
             return [agent.name], "No other options available."
         
-        # Build ranking prompt
-        answers_text = "\n\n".join([
-            f"Agent {name}:\n{answer}" 
-            for name, answer in available_answers.items()
-        ])
+        # A single candidate ranks itself; no need to ask the model
+        if len(available_answers) == 1:
+            return list(available_answers), "Only one option available."
         
-        ranking_prompt = f"""You are {agent.name}. Rank ALL of the following answers from BEST to WORST.
-
-Question: {question}
-
-Answers:
-{answers_text}
-
-Provide your ranking as a numbered list with the agent names, followed by a brief justification.
-
-Format:
-1. [Agent Name]
-2. [Agent Name]
-3. [Agent Name]
-...
-
-Justification: [Your reasoning]"""
+        # Shared question/answers/instructions first, voter identity last, so
+        # every voter's prompt starts with the same prefix the server can reuse
+        if ranking_prefix is None:
+            ranking_prefix = _ranking_prefix(question, answers)
+        if self.allow_self_voting:
+            ranking_prompt = f"{ranking_prefix}\n\nYou are {agent.name}, provide your ranking now."
+        else:
+            ranking_prompt = (
+                f"{ranking_prefix}\n\nYou are {agent.name}. Do not include your own answer "
+                f"(Agent {agent.name}) in the ranking; provide your ranking now."
+            )
 
-        response = llm_interface.generate(ranking_prompt, agent.model)
+        schema = _ranking_schema(list(available_answers))
+        
+        async def read_ranking() -> str:
+            # Stream the response and hang up as soon as the parser has what it
+            # needs, instead of waiting out trailing whitespace or extra prose
+            stream = llm_interface.agenerate_stream(ranking_prompt, agent.model, format=schema)
+            parts: List[str] = []
+            try:
+                async for text in stream:
+                    parts.append(text)
+                    if ("}" in text or "\n" in text) and _ranking_complete("".join(parts)):
+                        break
+            finally:
+                await stream.aclose()
+            return "".join(parts).strip()
         
-        # Parse rankings
+        if in_flight is None:
+            response = await read_ranking()
+        else:
+            key = (agent.model, ranking_prompt)
+            request = in_flight.get(key)
+            if request is None:
+                request = in_flight[key] = asyncio.ensure_future(read_ranking())
+            response = await request
+        
+        # Names match in any casing, undecorated, and each agent counts once
+        name_map = {name.lower(): name for name in available_answers}
         ranked_list = []
-        justification = ""
-        
-        lines = response.strip().split('\n')
-        for line in lines:
-            line = line.strip()
-            if line.lower().startswith('justification'):
-                justification = line.split(':', 1)[1].strip() if ':' in line else ""
-            elif line and (line[0].isdigit() or line.startswith('-')):
-                # Extract agent name from numbered list
-                parts = line.split('.', 1) if '.' in line else line.split('-', 1)
-                if len(parts) > 1:
-                    name = parts[1].strip()
-                    if name in available_answers:
-                        ranked_list.append(name)
-        
-        # Fallback: if parsing failed, use random order
+        
+        def add(item: str) -> None:
+            item = item.lower()
+            name = name_map.get(item) or name_map.get(_NAME_DECORATION_RE.sub("", item))
+            if name is not None and name not in ranked_list:
+                ranked_list.append(name)
+        
+        try:
+            data = orjson.loads(response)
+            for item in data["ranking"]:
+                add(str(item))
+            justification = str(data.get("justification") or "")
+        except (orjson.JSONDecodeError, KeyError, TypeError, AttributeError):
+            # Servers without schema support answer in free text: scan for a numbered list
+            for match in _RANK_RE.finditer(response):
+                add(match.group("item"))
+            just_match = _JUST_RE.search(response)
+            justification = (just_match.group("text") or just_match.group("next") or "") if just_match else ""
+        
+        # Fallback: if parsing failed, keep the answers' own order so reruns agree
         if not ranked_list:
-            import random
-            ranked_list = list(available_answers.keys())
-            random.shuffle(ranked_list)
-            justification = "Ranking parsing failed, random order used."
+            ranked_list = list(available_answers)
+            justification = "Ranking parsing failed, deterministic order used."
         
         return ranked_list, justification
     
@@ -284,35 +549,64 @@ Justification: [Your reasoning]"""
         Returns:
             Formatted summary string
         """
-        summary = f"\n{'='*60}\n"
-        summary += f"📊 VOTING RESULTS - Round {vote_result['round']}\n"
-        summary += f"{'='*60}\n\n"
+        parts = [
+            f"\n{'='*60}\n",
+            f"📊 VOTING RESULTS - Round {vote_result['round']}\n",
+            f"{'='*60}\n\n"
+        ]
         
         if vote_result['method'] == 'single-choice':
-            votes = vote_result['votes']
-            sorted_votes = sorted(votes.items(), key=lambda x: x[1], reverse=True)
+            sorted_votes = self._standings(vote_result)
             
-            summary += "Vote Tally:\n"
-            for agent_name, count in sorted_votes:
-                bar = "█" * count
-                summary += f"  {agent_name:20} | {bar} {count} vote(s)\n"
+            parts.append("Vote Tally:\n")
+            parts.extend(
+                f"  {agent_name:20} | {'█' * min(count, _MAX_BAR_LENGTH)} {count} vote(s)\n"
+                for agent_name, count in sorted_votes
+            )
             
-            summary += f"\n🏆 Most votes: {sorted_votes[0][0]} ({sorted_votes[0][1]} votes)\n"
-            summary += f"❌ Least votes: {sorted_votes[-1][0]} ({sorted_votes[-1][1]} votes)\n"
+            parts.append(f"\n🏆 Most votes: {sorted_votes[0][0]} ({sorted_votes[0][1]} votes)\n")
+            parts.append(f"❌ Least votes: {sorted_votes[-1][0]} ({sorted_votes[-1][1]} votes)\n")
             
         elif vote_result['method'] == 'ranked-choice':
-            points = vote_result['points']
-            sorted_points = sorted(points.items(), key=lambda x: x[1], reverse=True)
+            sorted_points = self._standings(vote_result)
             
-            summary += "Points (Ranked Choice):\n"
-            for agent_name, pts in sorted_points:
-                summary += f"  {agent_name:20} | {pts:.1f} points\n"
+            parts.append("Points (Ranked Choice):\n")
+            parts.extend(
+                f"  {agent_name:20} | {pts:.1f} points\n"
+                for agent_name, pts in sorted_points
+            )
             
-            summary += f"\n🏆 Highest score: {sorted_points[0][0]} ({sorted_points[0][1]:.1f} points)\n"
-            summary += f"❌ Lowest score: {sorted_points[-1][0]} ({sorted_points[-1][1]:.1f} points)\n"
+            parts.append(f"\n🏆 Highest score: {sorted_points[0][0]} ({sorted_points[0][1]:.1f} points)\n")
+            parts.append(f"❌ Lowest score: {sorted_points[-1][0]} ({sorted_points[-1][1]:.1f} points)\n")
         
-        summary += f"\n{'='*60}\n"
-        return summary
+        parts.append(f"\n{'='*60}\n")
+        return "".join(parts)
+    
+    @staticmethod
+    def _standings(vote_result: Dict[str, Any]) -> List[Tuple[str, float]]:
+        """
+        Get (agent name, score) pairs ordered from highest to lowest score.
+        
+        Uses the order stored when the vote was tallied. Results that predate
+        it (e.g. loaded from an older log) are sorted once and the order is
+        stored on them, so later calls reuse it.
+        
+        Args:
+            vote_result: Vote result dictionary
+            
+        Returns:
+            Standings, best first (empty for an unknown method)
+        """
+        standings = vote_result.get('standings')
+        if standings is not None:
+            return standings
+        
+        field = {'single-choice': 'votes', 'ranked-choice': 'points'}.get(vote_result['method'])
+        if field is None:
+            return []
+        standings = sorted(vote_result[field].items(), key=itemgetter(1), reverse=True)
+        vote_result['standings'] = standings
+        return standings
     
     def get_loser(self, vote_result: Dict[str, Any]) -> str:
         """
@@ -324,17 +618,8 @@ Justification: [Your reasoning]"""
         Returns:
             Name of the agent with lowest score
         """
-        if vote_result['method'] == 'single-choice':
-            votes = vote_result['votes']
-            if not votes:
-                return ""
-            return min(votes.items(), key=lambda x: x[1])[0]
-        elif vote_result['method'] == 'ranked-choice':
-            points = vote_result['points']
-            if not points:
-                return ""
-            return min(points.items(), key=lambda x: x[1])[0]
-        return ""
+        standings = self._standings(vote_result)
+        return standings[-1][0] if standings else ""
     
     def get_winner(self, vote_result: Dict[str, Any]) -> str:
         """
@@ -346,14 +631,5 @@ Justification: [Your reasoning]"""
         Returns:
             Name of the agent with highest score
         """
-        if vote_result['method'] == 'single-choice':
-            votes = vote_result['votes']
-            if not votes:
-                return ""
-            return max(votes.items(), key=lambda x: x[1])[0]
-        elif vote_result['method'] == 'ranked-choice':
-            points = vote_result['points']
-            if not points:
-                return ""
-            return max(points.items(), key=lambda x: x[1])[0]
-        return ""
+        standings = self._standings(vote_result)
+        return standings[0][0] if standings else ""